@@ -46,6 +46,8 @@ dev_requirements = [
     "pytest-timeout>=2.1.0",
     "black>=23.0.0",
     "flake8>=6.0.0",
+    "ruff>=0.1.0",
+    "pytest-ruff>=0.2.0",
     "mypy>=1.0.0",
     "structlog>=23.0.0",
 ]
@@ -71,7 +73,7 @@ setup(
     package_dir={"": "src"},
     
     # Requirements
-    python_requires=">=3.8",
+    python_requires=">=3.10",
     install_requires=install_requires,
     extras_require=extras_require,
     
@@ -98,8 +100,6 @@ setup(
         "License :: OSI Approved :: MIT License",
         "Operating System :: OS Independent",
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.8",
-        "Programming Language :: Python :: 3.9",
         "Programming Language :: Python :: 3.10",
         "Programming Language :: Python :: 3.11",
         "Topic :: Communications :: Chat",
@@ -12,13 +12,14 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 import pickle
 import os
+import time
 from pathlib import Path
 
 from telegram import Update, BotCommand, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, CommandHandler
 from src.core.telegram_bot import (
     AIInterviewerBot, InterviewSession, PromptVariant, 
-    InterviewStage, PromptManager, ClaudeIntegration
+    InterviewStage, PromptManager, ClaudeIntegration, SessionCache, Engagement
 )
 from src.core.config import config
 from src.localization.localization import localization, t, SupportedLanguage
@@ -52,7 +53,8 @@ class SessionManager:
     def __init__(self, storage_dir: str = "sessions"):
         self.storage_dir = Path(storage_dir)
         self.storage_dir.mkdir(exist_ok=True)
-        self.sessions: Dict[int, InterviewSession] = {}
+        # Expiry is handled by cleanup_expired_sessions; evicted sessions stay on disk
+        self.sessions: SessionCache = SessionCache(idle_ttl=None)
         
         # Load existing sessions on startup
         self._load_sessions()
@@ -63,6 +65,7 @@ class SessionManager:
     
     def _load_sessions(self):
         """Load sessions from disk"""
+        loaded = []
         try:
             for session_file in self.storage_dir.glob("session_*.pkl"):
                 try:
@@ -71,7 +74,7 @@ class SessionManager:
                         
                     # Check if session is not expired
                     if self._is_session_valid(session):
-                        self.sessions[session.user_id] = session
+                        loaded.append(session)
                         logger.info("Loaded session", user_id=session.user_id)
                     else:
                         # Remove expired session file
@@ -83,15 +86,21 @@ class SessionManager:
                     
         except Exception as e:
             logger.error("Failed to load sessions", error=str(e))
+        
+        # Insert least recently active first so the cache starts in activity order
+        for session in sorted(loaded, key=lambda s: s.last_activity_ns):
+            self.sessions[session.user_id] = session
     
-    def _is_session_valid(self, session: InterviewSession) -> bool:
+    def _is_session_valid(self, session: InterviewSession, now_ns: Optional[int] = None) -> bool:
         """Check if session is still valid"""
-        timeout = timedelta(minutes=config.session_timeout_minutes)
-        return datetime.now() - session.last_activity < timeout
+        timeout_ns = config.session_timeout_minutes * 60 * 1_000_000_000
+        return (now_ns or time.time_ns()) - session.last_activity_ns < timeout_ns
     
     def get_session(self, user_id: int) -> Optional[InterviewSession]:
         """Get session for user"""
-        session = self.sessions.get(user_id)
+        session = self.sessions.touch(user_id)
+        if session is None:
+            session = self._restore_session(user_id)
         if session and self._is_session_valid(session):
             return session
         elif session:
@@ -99,6 +108,22 @@ class SessionManager:
             self.remove_session(user_id)
         return None
     
+    def _restore_session(self, user_id: int) -> Optional[InterviewSession]:
+        """Reload a session evicted from memory"""
+        session_file = self._get_session_file(user_id)
+        if not session_file.exists():
+            return None
+        
+        try:
+            with open(session_file, 'rb') as f:
+                session = pickle.load(f)
+        except Exception as e:
+            logger.error("Failed to restore session", user_id=user_id, error=str(e))
+            return None
+        
+        self.sessions[user_id] = session
+        return session
+    
     def create_session(self, user_id: int, username: str, variant: PromptVariant) -> InterviewSession:
         """Create new session"""
         session = InterviewSession(
@@ -108,8 +133,7 @@ class SessionManager:
             current_stage=InterviewStage.GREETING,
             stage_completeness={stage.value: 0 for stage in InterviewStage},
             conversation_history=[],
-            start_time=datetime.now(),
-            last_activity=datetime.now()
+            start_time=datetime.now()
         )
         
         self.sessions[user_id] = session
@@ -124,7 +148,7 @@ class SessionManager:
     
     def update_session(self, session: InterviewSession):
         """Update existing session"""
-        session.last_activity = datetime.now()
+        session.touch()
         self.sessions[session.user_id] = session
         self._save_session(session)
     
@@ -151,11 +175,14 @@ class SessionManager:
                         error=str(e))
     
     def cleanup_expired_sessions(self):
-        """Remove expired sessions"""
-        expired_users = []
-        for user_id, session in self.sessions.items():
-            if not self._is_session_valid(session):
-                expired_users.append(user_id)
+        """Remove expired sessions in one batched sweep"""
+        # Scan every session: cache order follows lookups, which do not
+        # update last_activity_ns, so it is not strictly activity order
+        now_ns = time.time_ns()
+        expired_users = [
+            user_id for user_id, session in self.sessions.items()
+            if not self._is_session_valid(session, now_ns)
+        ]
         
         for user_id in expired_users:
             self.remove_session(user_id)
@@ -192,6 +219,25 @@ class MetricsCollector:
 class EnhancedAIInterviewerBot(AIInterviewerBot):
     """Enhanced version with better error handling and monitoring"""
     
+    # Static keyboards, built once and shared by all users
+    _CONFIRM_COMPLETE_MARKUP = InlineKeyboardMarkup([
+        [InlineKeyboardButton("✅ Yes, Complete Interview", callback_data="confirm_complete")],
+        [InlineKeyboardButton("❌ Cancel", callback_data="cancel_complete")]
+    ])
+    _COMPLETE_MARKUP = InlineKeyboardMarkup([[InlineKeyboardButton("✅ Complete Interview", callback_data="confirm_complete")]])
+    _LANGUAGE_COMMAND_MARKUP = InlineKeyboardMarkup([
+        [
+            InlineKeyboardButton(t("language_english"), callback_data="lang_en"),
+            InlineKeyboardButton(t("language_russian"), callback_data="lang_ru")
+        ]
+    ])
+    _BEGIN_MARKUPS = {
+        language: InlineKeyboardMarkup([[InlineKeyboardButton(
+            localization.get_text_for_language("begin_interview", language), callback_data="start_interview"
+        )]])
+        for language in SupportedLanguage
+    }
+    
     def __init__(self, telegram_token: str, anthropic_api_key: str, assemblyai_api_key: Optional[str] = None):
         # Initialize session manager and metrics
         self.session_manager = SessionManager()
@@ -286,8 +332,7 @@ class EnhancedAIInterviewerBot(AIInterviewerBot):
 {t("ready_to_begin", user_id)}
 """
             
-            keyboard = [[InlineKeyboardButton(t("begin_interview", user_id), callback_data="start_interview")]]
-            reply_markup = InlineKeyboardMarkup(keyboard)
+            reply_markup = self._BEGIN_MARKUPS[localization.get_user_language(user_id)]
             
             await query.edit_message_text(confirmation_message, reply_markup=reply_markup, parse_mode='Markdown')
             
@@ -319,12 +364,33 @@ class EnhancedAIInterviewerBot(AIInterviewerBot):
             
             self.metrics.increment('messages_processed')
             
-            # Add user message to history
-            session.add_message("user", user_message)
-            
-            # Show typing indicator
+            # Hand the Claude round-trip to this user's worker before anything else
+            # awaits, so turns stay in order while updates are processed concurrently
+            await self._enqueue_turn(session, update, user_message)
             await context.bot.send_chat_action(chat_id=update.effective_chat.id, action='typing')
             
+        except Exception as e:
+            logger.error("Message handling failed",
+                        user_id=user_id,
+                        message=user_message,
+                        error=str(e),
+                        traceback=traceback.format_exc())
+            
+            self.metrics.increment('errors_occurred')
+            
+            await update.message.reply_text(
+                t("message_processing_error", user_id)
+            )
+    
+    async def _respond_to_message(self, session: InterviewSession, update: Update, user_message: str,
+                                  metadata: Optional[Dict] = None):
+        """Record a user turn, generate Claude reply with retries, update the session and send it"""
+        user_id = session.user_id
+        
+        try:
+            # Add user message to history
+            session.add_message("user", user_message, metadata, store=self.conversation_store)
+            
             # Generate response with retry logic
             max_retries = 3
             response_data = None
@@ -355,7 +421,7 @@ class EnhancedAIInterviewerBot(AIInterviewerBot):
                             'metadata': {
                                 'question_depth': session.question_depth,
                                 'completeness': session.stage_completeness.get(session.current_stage.value, 0),
-                                'engagement_level': session.engagement_level
+                                'engagement_level': session.engagement_level.label
                             },
                             'error': 'API_RETRY_FAILED'
                         }
@@ -369,7 +435,7 @@ class EnhancedAIInterviewerBot(AIInterviewerBot):
                 return
             
             # Add response to history and save session
-            session.add_message("assistant", response_data['response'], response_data.get('metadata'))
+            session.add_message("assistant", response_data['response'], response_data.get('metadata'), store=self.conversation_store)
             self.session_manager.update_session(session)
             
             # Send response to user
@@ -393,7 +459,7 @@ class EnhancedAIInterviewerBot(AIInterviewerBot):
         if 'metadata' in response_data:
             metadata = response_data['metadata']
             session.question_depth = metadata.get('question_depth', session.question_depth)
-            session.engagement_level = metadata.get('engagement_level', session.engagement_level)
+            session.engagement_level = Engagement.from_metadata(metadata.get('engagement_level'), session.engagement_level)
             
             # Update stage completeness
             stage = response_data.get('interview_stage', session.current_stage.value)
@@ -454,7 +520,7 @@ class EnhancedAIInterviewerBot(AIInterviewerBot):
 
 {t("session_summary", user_id)}
 {t("duration", user_id, duration=int(duration.total_seconds() // 60))}
-{t("messages_exchanged", user_id, count=len(session.conversation_history))}
+{t("messages_exchanged", user_id, count=session.message_count)}
 {t("examples_collected", user_id, count=session.examples_collected)}
 {t("key_insights", user_id, count=len(session.key_insights))}
 
@@ -482,7 +548,7 @@ class EnhancedAIInterviewerBot(AIInterviewerBot):
                 await update.message.reply_text(summary, parse_mode='Markdown')
             
             # Archive completed session
-            self._archive_session(session)
+            await self._archive_session(session)
             self.session_manager.remove_session(session.user_id)
             
         except Exception as e:
@@ -490,9 +556,14 @@ class EnhancedAIInterviewerBot(AIInterviewerBot):
                         user_id=session.user_id,
                         error=str(e))
     
-    def _archive_session(self, session: InterviewSession):
+    async def _archive_session(self, session: InterviewSession):
         """Archive completed session for analysis"""
         try:
+            # Full transcript from the store; the in-memory window if it is unavailable
+            history = await self.conversation_store.history(
+                session.user_id, since_ns=int(session.start_time.timestamp() * 1e9)
+            )
+            
             archive_dir = Path("completed_sessions")
             archive_dir.mkdir(exist_ok=True)
             
@@ -507,7 +578,10 @@ class EnhancedAIInterviewerBot(AIInterviewerBot):
                 'start_time': session.start_time.isoformat(),
                 'end_time': datetime.now().isoformat(),
                 'stage_completeness': session.stage_completeness,
-                'conversation_history': session.conversation_history,
+                'conversation_history': [
+                    {**message, 'timestamp': datetime.fromtimestamp(message['ts_ns'] / 1e9).isoformat()}
+                    for message in history or session.conversation_history
+                ],
                 'examples_collected': session.examples_collected,
                 'key_insights': session.key_insights
             }
@@ -578,16 +652,10 @@ class EnhancedAIInterviewerBot(AIInterviewerBot):
         session = self.sessions[user_id]
         
         # Show completion confirmation with button
-        keyboard = [
-            [InlineKeyboardButton("✅ Yes, Complete Interview", callback_data="confirm_complete")],
-            [InlineKeyboardButton("❌ Cancel", callback_data="cancel_complete")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
         await update.message.reply_text(
             "🤔 Are you sure you want to complete the current interview?\n\n"
             "This will save your session to completed interviews and end the current conversation.",
-            reply_markup=reply_markup
+            reply_markup=self._CONFIRM_COMPLETE_MARKUP
         )
     
     async def button_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -632,29 +700,18 @@ class EnhancedAIInterviewerBot(AIInterviewerBot):
         # Add completion button if interview has some progress
         total_completeness = sum(session.stage_completeness.values())
         if total_completeness > 10:  # If some progress made
-            keyboard = [[InlineKeyboardButton("✅ Complete Interview", callback_data="confirm_complete")]]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            
             await update.message.reply_text(
                 "💡 You can manually complete this interview if you're done.",
-                reply_markup=reply_markup
+                reply_markup=self._COMPLETE_MARKUP
             )
     
     async def language_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Language selection command"""
         user_id = update.effective_user.id
         
-        keyboard = [
-            [
-                InlineKeyboardButton(t("language_english"), callback_data="lang_en"),
-                InlineKeyboardButton(t("language_russian"), callback_data="lang_ru")
-            ]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
         await update.message.reply_text(
             f"{t('language_selection', user_id)}\n\n{t('select_language', user_id)}",
-            reply_markup=reply_markup,
+            reply_markup=self._LANGUAGE_COMMAND_MARKUP,
             parse_mode='Markdown'
         )
     
@@ -0,0 +1,143 @@
+"""
+SQLite-backed conversation history for AI Interviewer Bot
+
+Sessions keep only a short window of messages in memory; every message is
+also appended here so the full transcript survives restarts and can be
+exported when an interview is archived.
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Pending messages are written in one batch at most this often
+FLUSH_INTERVAL_SECONDS = 0.05
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    user_id INTEGER NOT NULL,
+    ts_ns INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    content TEXT NOT NULL,
+    metadata TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS idx_conversations_user_ts ON conversations (user_id, ts_ns);
+"""
+# Databases created before message metadata was stored
+_ADD_METADATA = "ALTER TABLE conversations ADD COLUMN metadata TEXT NOT NULL DEFAULT '{}'"
+
+_INSERT = "INSERT INTO conversations (user_id, ts_ns, role, stage, content, metadata) VALUES (?, ?, ?, ?, ?, ?)"
+_SELECT = (
+    "SELECT ts_ns, role, stage, content, metadata FROM conversations "
+    "WHERE user_id = ? AND ts_ns >= ? ORDER BY ts_ns DESC LIMIT ?"
+)
+
+Row = Tuple[int, int, str, str, str, str]
+
+class ConversationStore:
+    """Append-only message log in SQLite (WAL) with batched background writes"""
+    
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(conversations)")}
+        if 'metadata' not in columns:
+            self._db.execute(_ADD_METADATA)
+        
+        self._closed = False
+        self._db_lock = threading.Lock()
+        self._pending: List[Row] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="conversation-store")
+    
+    def append(self, user_id: int, message: Dict[str, Any]):
+        """
+        Queue a message for writing
+        
+        Inside a running event loop the write is batched with other messages
+        and done on the background writer; outside of one it is written
+        immediately.
+        """
+        if self._closed:
+            logger.warning(f"Conversation store closed, dropping message for user {user_id}")
+            return
+        
+        self._pending.append((
+            user_id, message['ts_ns'], message['role'], message['stage'], message['content'],
+            json.dumps(message.get('metadata') or {}, default=str)
+        ))
+        
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write_rows(self._take_pending())
+            return
+        
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(FLUSH_INTERVAL_SECONDS, self._flush_in_background)
+    
+    async def history(self, user_id: int, since_ns: int = 0, limit: int = -1) -> List[Dict[str, Any]]:
+        """Messages for a user in chronological order, newest `limit` if given; empty once closed"""
+        if self._closed:
+            return []
+        
+        # Read on the writer, behind any queued batch, so the read sees every message
+        future = self._writer.submit(self._read_rows, self._take_pending(), user_id, since_ns, limit)
+        rows = await asyncio.wrap_future(future)
+        
+        return [
+            {'ts_ns': ts_ns, 'role': role, 'stage': stage, 'content': content, 'metadata': json.loads(metadata)}
+            for ts_ns, role, stage, content, metadata in reversed(rows)
+        ]
+    
+    def close(self):
+        """Write pending messages and close the database"""
+        if self._closed:
+            return
+        self._closed = True
+        self._writer.shutdown(wait=True)
+        self._write_rows(self._take_pending())
+        with self._db_lock:
+            self._db.close()
+    
+    def _take_pending(self) -> List[Row]:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        rows, self._pending = self._pending, []
+        return rows
+    
+    def _flush_in_background(self):
+        rows = self._take_pending()
+        if rows:
+            future = self._writer.submit(self._write_rows, rows)
+            future.add_done_callback(self._log_write_failure)
+    
+    def _write_rows(self, rows: List[Row]):
+        if not rows:
+            return
+        with self._db_lock, self._db:
+            self._db.executemany(_INSERT, rows)
+    
+    def _read_rows(self, pending: List[Row], user_id: int, since_ns: int, limit: int) -> List[Tuple[int, str, str, str, str]]:
+        self._write_rows(pending)
+        with self._db_lock:
+            return self._db.execute(_SELECT, (user_id, since_ns, limit)).fetchall()
+    
+    def _log_write_failure(self, future: Future):
+        """Report background write errors instead of dropping them"""
+        error = future.exception()
+        if error is not None:
+            logger.error(f"Failed to store conversation messages: {error}")
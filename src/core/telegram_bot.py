@@ -15,18 +15,42 @@ import asyncio
 import json
 import logging
 import os
-from datetime import datetime
+import re
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, asdict
-from enum import Enum
+from types import MappingProxyType
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Mapping, Optional, Tuple
+from dataclasses import InitVar, MISSING, dataclass, asdict, field, fields
+from enum import Enum, IntEnum
 
 import anthropic
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup, KeyboardButton, BotCommand
-from telegram.ext import Application, CommandHandler, MessageHandler, CallbackQueryHandler, filters, ContextTypes
+import httpx
+from telegram import Update, Message, InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup, KeyboardButton, BotCommand
+from telegram.error import BadRequest, TelegramError
+from telegram.ext import AIORateLimiter, Application, CommandHandler, MessageHandler, CallbackQueryHandler, filters, ContextTypes
+from telegram.request import HTTPXRequest
 
 # Import localization
 from src.localization.localization import localization, t, SupportedLanguage
+from src.core.conversation_store import ConversationStore
+
+# Fast JSON parsing (optional)
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Faster event loop (optional, not available on Windows)
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
 
 # Voice processing imports (optional)
 try:
@@ -42,6 +66,39 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Fenced ```json block in a Claude reply
+_JSON_FENCE_RE = re.compile(r"```json\s*(.*?)\s*```", re.S)
+_REQUIRED_RESPONSE_FIELDS = frozenset(('interview_stage', 'response', 'metadata'))
+# Start of the "response" string value in a (possibly incomplete) JSON reply
+_RESPONSE_FIELD_RE = re.compile(r'"response"\s*:\s*"')
+
+def _partial_response_text(buffer: str) -> Optional[str]:
+    """Decode as much of the "response" field as has been streamed so far"""
+    match = _RESPONSE_FIELD_RE.search(buffer)
+    if match is None:
+        return None
+    
+    start = index = match.end()
+    escaped = False
+    while index < len(buffer):
+        char = buffer[index]
+        if escaped:
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif char == '"':
+            break
+        index += 1
+    
+    raw = buffer[start:index]
+    if escaped:
+        raw = raw[:-1]
+    try:
+        return json.loads(f'"{raw}"', strict=False)
+    except json.JSONDecodeError:
+        # Incomplete \uXXXX escape at the end of the buffer
+        return None
+
 class PromptVariant(Enum):
     """Available prompt variants for the interviewer"""
     MASTER = "v1_master"
@@ -62,7 +119,50 @@ class InterviewStage(Enum):
     GROWTH_PATH = "growth_path"
     WRAP_UP = "wrap_up"
 
-@dataclass
+class Engagement(IntEnum):
+    """User engagement level reported by Claude"""
+    LOW = 0
+    MEDIUM = 1
+    HIGH = 2
+    
+    @property
+    def label(self) -> str:
+        return self.name.lower()
+    
+    @classmethod
+    def from_metadata(cls, value: Any, default: 'Engagement') -> 'Engagement':
+        """Map an engagement label from response metadata, keeping default if unknown"""
+        return _ENGAGEMENT_LEVELS.get(value, default)
+
+_ENGAGEMENT_LEVELS: Dict[str, Engagement] = {level.label: level for level in Engagement}
+
+# Static stage ordering and display names
+_STAGES: Tuple[InterviewStage, ...] = tuple(InterviewStage)
+_STAGE_INDEX: Dict[InterviewStage, int] = {stage: i for i, stage in enumerate(_STAGES)}
+_STAGE_TITLES: Tuple[str, ...] = tuple(stage.value.title() for stage in _STAGES)
+# /status progress line prefixes per stage, and the complete line for untouched stages
+_STAGE_CURRENT_PREFIXES: Tuple[str, ...] = tuple(f"▶️ **{title}**: " for title in _STAGE_TITLES)
+_STAGE_DONE_PREFIXES: Tuple[str, ...] = tuple(f"✅ {title}: " for title in _STAGE_TITLES)
+_STAGE_PENDING_LINES: Tuple[str, ...] = tuple(f"⏳ {title}: 0%\n" for title in _STAGE_TITLES)
+_STAGE_NAMES: Mapping[InterviewStage, str] = MappingProxyType({
+    InterviewStage.PROFILING: "Profiling (Background)",
+    InterviewStage.ESSENCE: "Essence (Role Philosophy)", 
+    InterviewStage.OPERATIONS: "Operations (Work Processes)",
+    InterviewStage.EXPERTISE_MAP: "Expertise Map (Knowledge Levels)",
+    InterviewStage.FAILURE_MODES: "Failure Modes (Common Mistakes)",
+    InterviewStage.MASTERY: "Mastery (Expert Insights)",
+    InterviewStage.GROWTH_PATH: "Growth Path (Development)",
+    InterviewStage.WRAP_UP: "Wrap Up (Final Questions)"
+})
+
+# Messages kept verbatim per session; older ones are folded into summary_prefix
+HISTORY_WINDOW = 40
+CONTEXT_MESSAGES = 10
+# Fewer history messages are sent while the current stage is still shallow
+CONTEXT_WINDOWS = ((30, 2), (70, 6))
+SUMMARY_PREFIX_LIMIT = 4000
+
+@dataclass(slots=True)
 class InterviewSession:
     """Interview session state"""
     user_id: int
@@ -70,62 +170,168 @@ class InterviewSession:
     prompt_variant: PromptVariant
     current_stage: InterviewStage
     stage_completeness: Dict[str, int]
-    conversation_history: List[Dict[str, Any]]
+    conversation_history: Deque[Dict[str, Any]]
     start_time: datetime
-    last_activity: datetime
+    last_activity: InitVar[Optional[datetime]] = None
     question_depth: int = 1
-    engagement_level: str = "medium"
+    engagement_level: Engagement = Engagement.MEDIUM
     examples_collected: int = 0
-    key_insights: List[str] = None
+    key_insights: List[str] = field(default_factory=list)
+    summary_prefix: str = ""
+    message_count: int = 0
+    last_activity_ns: int = 0  # wall-clock time.time_ns() of the latest activity
     
-    def __post_init__(self):
-        if self.key_insights is None:
-            self.key_insights = []
+    def __post_init__(self, last_activity: Optional[datetime]):
+        if not self.last_activity_ns:
+            self.last_activity_ns = time.time_ns() if last_activity is None else int(last_activity.timestamp() * 1e9)
+        if not isinstance(self.conversation_history, deque):
+            self.conversation_history = deque(self.conversation_history, maxlen=HISTORY_WINDOW)
         if not self.stage_completeness:
             self.stage_completeness = {stage.value: 0 for stage in InterviewStage}
     
-    def add_message(self, role: str, content: str, metadata: Dict = None):
-        """Add message to conversation history"""
+    def __setstate__(self, state):
+        """Restore a pickled session, including __dict__ pickles from before slots"""
+        if isinstance(state, tuple):
+            # Slots pickle: (instance dict, slot values)
+            state = {**(state[0] or {}), **state[1]}
+        for f in fields(self):
+            if f.name in state:
+                value = state[f.name]
+            elif f.default_factory is not MISSING:
+                value = f.default_factory()
+            else:
+                value = f.default
+            setattr(self, f.name, value)
+        
+        if not isinstance(self.engagement_level, Engagement):
+            self.engagement_level = Engagement.from_metadata(self.engagement_level, Engagement.MEDIUM)
+        if not self.last_activity_ns:
+            # Sessions pickled before integer timestamps carry a last_activity datetime
+            last_activity = state.get('last_activity')
+            self.last_activity_ns = time.time_ns() if last_activity is None else int(last_activity.timestamp() * 1e9)
+        for message in self.conversation_history:
+            if 'ts_ns' not in message:
+                timestamp = message.pop('timestamp', None)
+                message['ts_ns'] = int(datetime.fromisoformat(timestamp).timestamp() * 1e9) if timestamp else self.last_activity_ns
+        if not isinstance(self.conversation_history, deque):
+            # Sessions pickled before the window kept the full history as a list
+            history = list(self.conversation_history)
+            self.message_count = self.message_count or len(history)
+            self._fold_into_summary(history[:-HISTORY_WINDOW])
+            self.conversation_history = deque(history[-HISTORY_WINDOW:], maxlen=HISTORY_WINDOW)
+    
+    def _fold_into_summary(self, messages):
+        """Keep a short trace of messages dropped from the verbatim window"""
+        for message in messages:
+            self.summary_prefix += f"[{message['role']}@{message['stage']}:{message['content'][:80]}] "
+        self.summary_prefix = self.summary_prefix[-SUMMARY_PREFIX_LIMIT:]
+    
+    def add_message(self, role: str, content: str, metadata: Dict = None, store: Optional[ConversationStore] = None):
+        """Add message to conversation history, also appending it to store if given
+        
+        The session only keeps a window of recent messages; the store keeps them all.
+        """
         message = {
             'role': role,
             'content': content,
-            'timestamp': datetime.now().isoformat(),
+            'ts_ns': time.time_ns(),
             'stage': self.current_stage.value,
             'metadata': metadata or {}
         }
-        self.conversation_history.append(message)
-        self.last_activity = datetime.now()
+        history = self.conversation_history
+        if len(history) >= HISTORY_WINDOW - 1:
+            # Fold the oldest exchange into the summary instead of keeping it verbatim
+            self._fold_into_summary((history.popleft(), history.popleft()))
+        history.append(message)
+        if store is not None:
+            store.append(self.user_id, message)
+        self.message_count += 1
+        self.last_activity_ns = message['ts_ns']
+    
+    def touch(self):
+        """Record activity without adding a message"""
+        self.last_activity_ns = time.time_ns()
+    
+    @property
+    def last_activity_at(self) -> datetime:
+        """Latest activity as a datetime, for display and export"""
+        return datetime.fromtimestamp(self.last_activity_ns / 1e9)
+
+# Persistent bot data; the complete conversation log lives here, sessions
+# hold only the recent window in memory
+DATA_DIR = Path(os.getenv('DATA_DIR', 'data'))
+CONVERSATION_DB_PATH = DATA_DIR / "db" / "conversations.db"
+
+# In-memory session bounds: least recently used sessions are evicted first
+MAX_SESSIONS = 10_000
+SESSION_IDLE_TTL = timedelta(hours=2)
+SESSION_EVICTION_INTERVAL = timedelta(minutes=5)
+
+class SessionCache(OrderedDict):
+    """LRU mapping of user_id -> InterviewSession bounded by count and idle time"""
+    
+    def __init__(self, max_sessions: int = MAX_SESSIONS, idle_ttl: Optional[timedelta] = SESSION_IDLE_TTL):
+        super().__init__()
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+    
+    def __setitem__(self, user_id: int, session: InterviewSession):
+        super().__setitem__(user_id, session)
+        self.move_to_end(user_id)
+        while len(self) > self.max_sessions:
+            evicted_id, _ = self.popitem(last=False)
+            logger.info(f"Evicted least recently used session: {evicted_id}")
+    
+    def touch(self, user_id: int) -> Optional[InterviewSession]:
+        """Get session and mark it as most recently used"""
+        session = self.get(user_id)
+        if session is not None:
+            self.move_to_end(user_id)
+        return session
+    
+    def evict_idle(self, now_ns: Optional[int] = None) -> int:
+        """Drop idle sessions from the least recently used end"""
+        if self.idle_ttl is None:
+            return 0
+        
+        cutoff_ns = (now_ns or time.time_ns()) - int(self.idle_ttl.total_seconds() * 1e9)
+        evicted = 0
+        while self:
+            user_id, session = next(iter(self.items()))
+            if session.last_activity_ns >= cutoff_ns:
+                break
+            del self[user_id]
+            evicted += 1
+        return evicted
+
+PROMPT_DIR = Path("prompts")
+PROMPT_FILES: Dict[PromptVariant, str] = {
+    PromptVariant.MASTER: "prompt_v1_master_interviewer.md",
+    PromptVariant.TELEGRAM_OPTIMIZED: "prompt_v2_telegram_optimized.md", 
+    PromptVariant.CONVERSATIONAL: "prompt_v3_conversational_balanced.md",
+    PromptVariant.STAGE_SPECIFIC: "prompt_v4_stage_specific.md",
+    PromptVariant.CONVERSATION_MGMT: "prompt_v5_conversation_management.md"
+}
+
+@lru_cache(maxsize=None)
+def _load_prompt_file(filename: str) -> Optional[str]:
+    """Read a prompt file once, on first use"""
+    prompt_path = PROMPT_DIR / filename
+    try:
+        prompt = prompt_path.read_text(encoding='utf-8')
+    except FileNotFoundError:
+        logger.error(f"Prompt file not found: {prompt_path}")
+        return None
+    
+    logger.info(f"Loaded prompt file: {filename}")
+    return prompt
 
 class PromptManager:
     """Manages different prompt variants"""
     
     def __init__(self):
-        self.prompts = self._load_prompts()
-    
-    def _load_prompts(self) -> Dict[PromptVariant, str]:
-        """Load all prompt variants from files"""
-        prompts = {}
-        
-        prompt_files = {
-            PromptVariant.MASTER: "prompt_v1_master_interviewer.md",
-            PromptVariant.TELEGRAM_OPTIMIZED: "prompt_v2_telegram_optimized.md", 
-            PromptVariant.CONVERSATIONAL: "prompt_v3_conversational_balanced.md",
-            PromptVariant.STAGE_SPECIFIC: "prompt_v4_stage_specific.md",
-            PromptVariant.CONVERSATION_MGMT: "prompt_v5_conversation_management.md"
-        }
-        
-        for variant, filename in prompt_files.items():
-            try:
-                prompt_path = Path("prompts") / filename
-                with open(prompt_path, 'r', encoding='utf-8') as f:
-                    prompts[variant] = f.read()
-                logger.info(f"Loaded prompt variant: {variant.value}")
-            except FileNotFoundError:
-                logger.error(f"Prompt file not found: {prompt_path}")
-                # Fallback basic prompt
-                prompts[variant] = self._get_basic_prompt()
-        
-        return prompts
+        # Prompt files are read lazily by get_prompt
+        self.prompts = PROMPT_FILES
     
     def _get_basic_prompt(self) -> str:
         """Fallback basic prompt if files not found"""
@@ -137,24 +343,108 @@ Ask one question at a time and dig deeper into responses.
     
     def get_prompt(self, variant: PromptVariant) -> str:
         """Get prompt for specified variant"""
-        return self.prompts.get(variant, self._get_basic_prompt())
+        filename = self.prompts.get(variant)
+        prompt = _load_prompt_file(filename) if filename else None
+        return prompt if prompt is not None else self._get_basic_prompt()
     
     def get_variant_description(self, variant: PromptVariant, user_id: Optional[int] = None) -> str:
         """Get human-readable description of prompt variant"""
         return localization.format_prompt_description(variant.value, user_id)
 
+# Maximum number of updates PTB processes at the same time
+CONCURRENT_UPDATES = 32
+
+# Connections shared by all outgoing Bot API calls (getUpdates has its own)
+TELEGRAM_POOL_SIZE = 256
+
+class FastJSONRequest(HTTPXRequest):
+    """HTTPX request that parses Bot API responses with orjson when available"""
+    
+    @staticmethod
+    def parse_json_payload(payload: bytes) -> Dict[str, Any]:
+        try:
+            return _json_loads(payload)
+        except ValueError as exc:
+            decoded = payload.decode("utf-8", "replace")
+            logger.error(f'Can not load invalid JSON data: "{decoded}"')
+            raise TelegramError("Invalid server response") from exc
+
+# Background reply generation: user turns are sharded across workers by user_id
+RESPONSE_WORKERS = 8
+RESPONSE_QUEUE_SIZE = 10_000
+
+# Streaming: minimum delay and growth between partial reply edits
+STREAM_FLUSH_INTERVAL = 0.8
+STREAM_MIN_NEW_CHARS = 20
+
+# Upstream failures that count towards opening the Claude circuit breaker
+_UPSTREAM_ERRORS = (
+    anthropic.APIConnectionError,  # includes APITimeoutError
+    anthropic.RateLimitError,
+    anthropic.InternalServerError,
+    httpx.TimeoutException
+)
+
+class CircuitBreaker:
+    """Stop calling a failing upstream for a cool-down period"""
+    
+    def __init__(self, failure_threshold: int = 5, window_seconds: float = 30.0, cooldown_seconds: float = 15.0):
+        self.failure_threshold = failure_threshold
+        self.window_seconds = window_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self._failures: Deque[float] = deque()
+        self._opened_until = 0.0
+    
+    def is_open(self) -> bool:
+        """True while calls should be short-circuited"""
+        return time.monotonic() < self._opened_until
+    
+    def record_success(self):
+        self._failures.clear()
+    
+    def record_failure(self):
+        """Count a failure; open the breaker if too many happened within the window"""
+        now = time.monotonic()
+        failures = self._failures
+        failures.append(now)
+        while failures[0] < now - self.window_seconds:
+            failures.popleft()
+        
+        if len(failures) >= self.failure_threshold:
+            self._opened_until = now + self.cooldown_seconds
+            failures.clear()
+            logger.warning(f"Claude circuit breaker open for {self.cooldown_seconds:.0f}s")
+
 class ClaudeIntegration:
     """Claude Sonnet-4 integration for interview responses"""
     
     def __init__(self, api_key: str):
-        self.client = anthropic.Anthropic(api_key=api_key)
+        # Async client: requests share one connection pool on the event loop
+        self.client = anthropic.AsyncAnthropic(
+            api_key=api_key,
+            max_retries=2,
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=200, max_keepalive_connections=50)
+            )
+        )
         self.model = "claude-sonnet-4-20250514"  # Latest Claude Sonnet-4 model
-        
+        self._breaker = CircuitBreaker()
+    
     async def generate_interview_response(self, 
                                         session: InterviewSession, 
                                         user_message: str,
-                                        prompt_manager: PromptManager) -> Dict[str, Any]:
-        """Generate interview response using Claude"""
+                                        prompt_manager: PromptManager,
+                                        on_partial: Optional[Callable[[str], Awaitable[None]]] = None) -> Dict[str, Any]:
+        """Generate interview response using Claude
+        
+        If on_partial is given the reply is streamed and on_partial is called
+        with the growing "response" text as it arrives.
+        """
+        # Skip the network entirely while Claude is failing
+        if self._breaker.is_open():
+            return self._create_fallback_response(session, user_message)
+        
         try:
             # Get system prompt for current variant
             system_prompt = prompt_manager.get_prompt(session.prompt_variant)
@@ -163,66 +453,104 @@ class ClaudeIntegration:
             context = self._build_context(session, user_message)
             
             # Generate response
-            response = await asyncio.to_thread(
-                self.client.messages.create,
+            request = dict(
                 model=self.model,
                 max_tokens=1000,
                 temperature=0.7,
                 system=system_prompt,
                 messages=[{"role": "user", "content": context}]
             )
+            if on_partial is None:
+                response = await self.client.messages.create(**request)
+                response_text = response.content[0].text
+            else:
+                response_text = await self._stream_response(request, on_partial)
             
             # Parse response
-            response_text = response.content[0].text
-            return self._parse_json_response(response_text)
+            parsed = self._parse_json_response(response_text)
+            self._breaker.record_success()
+            return parsed
             
-        except Exception as e:
+        except _UPSTREAM_ERRORS as e:
+            self._breaker.record_failure()
+            logger.error(f"Claude API unavailable: {e}")
+            return self._create_fallback_response(session, user_message)
+        except anthropic.APIError as e:
             logger.error(f"Claude API error: {e}")
             return self._create_fallback_response(session, user_message)
+        except Exception as e:
+            # e.g. a failing on_partial callback; the user still gets a reply
+            logger.error(f"Error generating response: {e}")
+            return self._create_fallback_response(session, user_message)
+    
+    async def _stream_response(self, request: Dict[str, Any], on_partial: Callable[[str], Awaitable[None]]) -> str:
+        """Stream a reply, forwarding the partial "response" field at a throttled rate"""
+        chunks: List[str] = []
+        shown_length = 0
+        last_flush = time.monotonic()
+        
+        async with self.client.messages.stream(**request) as stream:
+            async for text in stream.text_stream:
+                chunks.append(text)
+                now = time.monotonic()
+                if now - last_flush < STREAM_FLUSH_INTERVAL:
+                    continue
+                
+                partial = _partial_response_text("".join(chunks))
+                if partial and len(partial) - shown_length >= STREAM_MIN_NEW_CHARS:
+                    shown_length = len(partial)
+                    last_flush = now
+                    await on_partial(partial)
+            
+            final_message = await stream.get_final_message()
+        
+        return final_message.content[0].text
     
     def _build_context(self, session: InterviewSession, user_message: str) -> str:
         """Build conversation context for Claude"""
-        # Get recent conversation history (last 5 exchanges)
-        recent_history = session.conversation_history[-10:]
+        # Get recent conversation history, sized by current stage completeness
+        completeness = session.stage_completeness[session.current_stage.value]
+        window = next((size for limit, size in CONTEXT_WINDOWS if completeness < limit), CONTEXT_MESSAGES)
+        history = session.conversation_history
+        recent_history = islice(history, max(len(history) - window, 0), None)
         
         # Get user language preference
         user_language = localization.get_user_language(session.user_id)
         language_instruction = "Respond in Russian" if user_language.value == "ru" else "Respond in English"
         
-        context = f"""
+        parts = [f"""
 Current Interview State:
 - Stage: {session.current_stage.value}
 - Question Depth: {session.question_depth}
-- Engagement Level: {session.engagement_level}
+- Engagement Level: {session.engagement_level.label}
 - Examples Collected: {session.examples_collected}
-- Stage Completeness: {session.stage_completeness[session.current_stage.value]}%
+- Stage Completeness: {completeness}%
 - User Language: {language_instruction}
 
 Recent Conversation History:
-"""
-        for msg in recent_history:
-            context += f"{msg['role']}: {msg['content']}\n"
-        
-        context += f"\nuser: {user_message}\n\nPlease respond in the specified JSON format."
+"""]
+        if session.summary_prefix:
+            parts.append(f"(earlier) {session.summary_prefix}\n")
+        parts.extend([f"{msg['role']}: {msg['content']}\n" for msg in recent_history])
+        parts.append(f"\nuser: {user_message}\n\nPlease respond in the specified JSON format.")
         
-        return context
+        return "".join(parts)
     
     def _parse_json_response(self, response_text: str) -> Dict[str, Any]:
         """Parse JSON response from Claude"""
         try:
             # Try to extract JSON from response
-            if '```json' in response_text:
-                json_start = response_text.find('```json') + 7
-                json_end = response_text.find('```', json_start)
-                json_text = response_text[json_start:json_end].strip()
+            match = _JSON_FENCE_RE.search(response_text)
+            if match:
+                json_text = match.group(1)
             else:
                 # Look for JSON-like structure
                 json_text = response_text.strip()
             
-            parsed = json.loads(json_text)
+            parsed = _json_loads(json_text)
             
             # Validate required fields
-            if not all(key in parsed for key in ['interview_stage', 'response', 'metadata']):
+            if not isinstance(parsed, dict) or not _REQUIRED_RESPONSE_FIELDS.issubset(parsed):
                 raise ValueError("Missing required fields in JSON response")
             
             return parsed
@@ -251,7 +579,7 @@ Recent Conversation History:
             'metadata': {
                 'question_depth': session.question_depth,
                 'completeness': session.stage_completeness[session.current_stage.value],
-                'engagement_level': session.engagement_level
+                'engagement_level': session.engagement_level.label
             },
             'error': 'API_ERROR'
         }
@@ -259,11 +587,62 @@ Recent Conversation History:
 class AIInterviewerBot:
     """Main AI Interviewer Telegram Bot"""
     
-    def __init__(self, telegram_token: str, anthropic_api_key: str, assemblyai_api_key: Optional[str] = None):
+    # Static help text and keyboards, built once and shared by all users
+    _HELP_TEXT = """
+🤖 **AI Interviewer Bot Commands**
+
+**/start** - Begin new interview
+**/status** - Check current progress  
+**/reset** - Reset current session
+**/help** - Show this help
+
+**Interview Process:**
+This bot conducts structured professional interviews to extract your expertise and knowledge. The process follows 9 stages from greeting to completion.
+
+**Tips for Best Results:**
+• Provide detailed, specific responses
+• Share concrete examples from your experience
+• Be open about your professional challenges
+• Take your time - quality over speed
+
+**Interview typically takes 90-120 minutes**
+"""
+    
+    _LANGUAGE_MARKUP = InlineKeyboardMarkup([
+        [
+            InlineKeyboardButton("🇺🇸 English", callback_data="select_lang_en"),
+            InlineKeyboardButton("🇷🇺 Русский", callback_data="select_lang_ru")
+        ]
+    ])
+    _DETAIL_MARKUP = InlineKeyboardMarkup([
+        [InlineKeyboardButton("🎯 Master", callback_data=f"prompt_{PromptVariant.MASTER.value}"),
+         InlineKeyboardButton("📱 Telegram", callback_data=f"prompt_{PromptVariant.TELEGRAM_OPTIMIZED.value}")],
+        [InlineKeyboardButton("💬 Conversational", callback_data=f"prompt_{PromptVariant.CONVERSATIONAL.value}"),
+         InlineKeyboardButton("🎪 Stage Specific", callback_data=f"prompt_{PromptVariant.STAGE_SPECIFIC.value}")],
+        [InlineKeyboardButton("🧠 Conversation Mgmt", callback_data=f"prompt_{PromptVariant.CONVERSATION_MGMT.value}")]
+    ])
+    _BEGIN_MARKUP = InlineKeyboardMarkup([[InlineKeyboardButton("🚀 Begin Interview", callback_data="start_interview")]])
+    
+    # Localized keyboards, one per supported language
+    _START_MARKUPS: Mapping[SupportedLanguage, InlineKeyboardMarkup] = MappingProxyType({
+        language: InlineKeyboardMarkup([
+            [InlineKeyboardButton(localization.get_text_for_language("btn_master", language), callback_data=f"prompt_{PromptVariant.MASTER.value}")],
+            [InlineKeyboardButton(localization.get_text_for_language("btn_telegram", language), callback_data=f"prompt_{PromptVariant.TELEGRAM_OPTIMIZED.value}")],
+            [InlineKeyboardButton(localization.get_text_for_language("btn_conversational", language), callback_data=f"prompt_{PromptVariant.CONVERSATIONAL.value}")],
+            [InlineKeyboardButton(localization.get_text_for_language("btn_stage_specific", language), callback_data=f"prompt_{PromptVariant.STAGE_SPECIFIC.value}")],
+            [InlineKeyboardButton(localization.get_text_for_language("btn_conversation_mgmt", language), callback_data=f"prompt_{PromptVariant.CONVERSATION_MGMT.value}")],
+            [InlineKeyboardButton(localization.get_text_for_language("prompt_learn_more", language), callback_data="learn_more")]
+        ])
+        for language in SupportedLanguage
+    })
+    
+    def __init__(self, telegram_token: str, anthropic_api_key: str, assemblyai_api_key: Optional[str] = None,
+                 conversation_store: Optional[ConversationStore] = None):
         self.telegram_token = telegram_token
         self.prompt_manager = PromptManager()
         self.claude = ClaudeIntegration(anthropic_api_key)
-        self.sessions: Dict[int, InterviewSession] = {}
+        self.sessions: SessionCache = SessionCache()
+        self.conversation_store = conversation_store or ConversationStore(CONVERSATION_DB_PATH)
         
         # Initialize voice processing if available and configured
         self.voice_handler = None
@@ -288,8 +667,86 @@ class AIInterviewerBot:
             logger.warning("Voice processing requested but voice_handler module not available")
         
         # Build application
-        self.application = Application.builder().token(telegram_token).build()
+        # Updates from different chats are handled concurrently; each user's
+        # text turns stay ordered through the sharded response queues
+        builder = (
+            Application.builder()
+            .token(telegram_token)
+            .concurrent_updates(CONCURRENT_UPDATES)
+            .request(FastJSONRequest(connection_pool_size=TELEGRAM_POOL_SIZE))
+            .get_updates_request(FastJSONRequest())
+        )
+        try:
+            # Stay under Telegram's 30 msg/s global and 20 msg/min per-group limits
+            builder = builder.rate_limiter(AIORateLimiter(
+                overall_max_rate=30,
+                overall_time_period=1,
+                group_max_rate=20,
+                group_time_period=60,
+                max_retries=2
+            ))
+        except RuntimeError:
+            # Raised when python-telegram-bot[rate-limiter] is not installed
+            logger.warning("aiolimiter not installed - outbound messages are not rate limited")
+        builder = builder.post_init(self._post_init).post_shutdown(self._post_shutdown)
+        self.application = builder.build()
         self._setup_handlers()
+        
+        # Periodically drop idle sessions (requires python-telegram-bot[job-queue])
+        if self.application.job_queue is not None:
+            self.application.job_queue.run_repeating(
+                self._evict_idle_sessions,
+                interval=SESSION_EVICTION_INTERVAL,
+                first=SESSION_EVICTION_INTERVAL
+            )
+    
+        # One queue per worker keeps each user's turns in order
+        self._response_queues: List[asyncio.Queue] = [
+            asyncio.Queue(maxsize=RESPONSE_QUEUE_SIZE // RESPONSE_WORKERS)
+            for _ in range(RESPONSE_WORKERS)
+        ]
+        self._response_workers: List[asyncio.Task] = []
+    
+    async def _post_init(self, application: Application):
+        """Configure bot commands and start background response workers"""
+        # Python 3.12+: run new tasks inline until their first real suspension
+        eager_task_factory = getattr(asyncio, "eager_task_factory", None)
+        if eager_task_factory is not None:
+            asyncio.get_running_loop().set_task_factory(eager_task_factory)
+        
+        await self.setup_bot_commands()
+        
+        self._response_workers = [
+            asyncio.create_task(self._response_worker(queue))
+            for queue in self._response_queues
+        ]
+    
+    async def _post_shutdown(self, application: Application):
+        """Stop background response workers and release stores and connections"""
+        for worker in self._response_workers:
+            worker.cancel()
+        await asyncio.gather(*self._response_workers, return_exceptions=True)
+        self._response_workers = []
+        self.conversation_store.close()
+        if self.voice_handler:
+            await self.voice_handler.close()
+    
+    async def _response_worker(self, queue: asyncio.Queue):
+        """Generate and send replies for queued user turns"""
+        while True:
+            session, update, user_message, metadata = await queue.get()
+            try:
+                await self._respond_to_message(session, update, user_message, metadata)
+            except Exception as e:
+                logger.error(f"Failed to respond to user {session.user_id}: {e}")
+            finally:
+                queue.task_done()
+    
+    async def _evict_idle_sessions(self, context):
+        """Periodic idle session eviction"""
+        evicted = self.sessions.evict_idle()
+        if evicted:
+            logger.info(f"Evicted {evicted} idle sessions")
     
     def _setup_handlers(self):
         """Setup Telegram bot handlers"""
@@ -307,8 +764,7 @@ class AIInterviewerBot:
         
         # Voice message handlers (if voice processing is available)
         if self.voice_handler:
-            self.application.add_handler(MessageHandler(filters.VOICE, self.handle_voice_message))
-            self.application.add_handler(MessageHandler(filters.AUDIO, self.handle_voice_message))
+            self.application.add_handler(MessageHandler(filters.VOICE | filters.AUDIO, self.handle_voice_message))
             logger.info("Voice message handlers added")
     
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -327,16 +783,8 @@ Hello {username}! / Привет, {username}!
 
 Please select your preferred language:
 Пожалуйста, выберите предпочитаемый язык:"""
-
-        keyboard = [
-            [
-                InlineKeyboardButton("🇺🇸 English", callback_data="select_lang_en"),
-                InlineKeyboardButton("🇷🇺 Русский", callback_data="select_lang_ru")
-            ]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
         
-        await update.message.reply_text(welcome_message, reply_markup=reply_markup, parse_mode='Markdown')
+        await update.message.reply_text(welcome_message, reply_markup=self._LANGUAGE_MARKUP, parse_mode='Markdown')
     
     async def _show_interview_selection(self, update: Update, user_id: int, username: str):
         """Show interview style selection for users with language set"""
@@ -346,15 +794,7 @@ Please select your preferred language:
 
 {t("welcome_choose_style", user_id)}"""
         
-        keyboard = [
-            [InlineKeyboardButton(t("btn_master", user_id), callback_data=f"prompt_{PromptVariant.MASTER.value}")],
-            [InlineKeyboardButton(t("btn_telegram", user_id), callback_data=f"prompt_{PromptVariant.TELEGRAM_OPTIMIZED.value}")],
-            [InlineKeyboardButton(t("btn_conversational", user_id), callback_data=f"prompt_{PromptVariant.CONVERSATIONAL.value}")],
-            [InlineKeyboardButton(t("btn_stage_specific", user_id), callback_data=f"prompt_{PromptVariant.STAGE_SPECIFIC.value}")],
-            [InlineKeyboardButton(t("btn_conversation_mgmt", user_id), callback_data=f"prompt_{PromptVariant.CONVERSATION_MGMT.value}")],
-            [InlineKeyboardButton(t("prompt_learn_more", user_id), callback_data="learn_more")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = self._START_MARKUPS[localization.get_user_language(user_id)]
         
         await update.message.reply_text(welcome_message, reply_markup=reply_markup, parse_mode='HTML')
     
@@ -366,15 +806,7 @@ Please select your preferred language:
 
 {t("welcome_choose_style", user_id)}"""
         
-        keyboard = [
-            [InlineKeyboardButton(t("btn_master", user_id), callback_data=f"prompt_{PromptVariant.MASTER.value}")],
-            [InlineKeyboardButton(t("btn_telegram", user_id), callback_data=f"prompt_{PromptVariant.TELEGRAM_OPTIMIZED.value}")],
-            [InlineKeyboardButton(t("btn_conversational", user_id), callback_data=f"prompt_{PromptVariant.CONVERSATIONAL.value}")],
-            [InlineKeyboardButton(t("btn_stage_specific", user_id), callback_data=f"prompt_{PromptVariant.STAGE_SPECIFIC.value}")],
-            [InlineKeyboardButton(t("btn_conversation_mgmt", user_id), callback_data=f"prompt_{PromptVariant.CONVERSATION_MGMT.value}")],
-            [InlineKeyboardButton(t("prompt_learn_more", user_id), callback_data="learn_more")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = self._START_MARKUPS[localization.get_user_language(user_id)]
         
         await query.message.reply_text(welcome_message, reply_markup=reply_markup, parse_mode='HTML')
     
@@ -383,39 +815,58 @@ Please select your preferred language:
         query = update.callback_query
         await query.answer()
         
+        # Callback data is "<kind>_<rest>", e.g. "prompt_v1_master" or "select_lang_en"
+        kind, _, rest = query.data.partition("_")
+        handler = self._CALLBACKS.get(kind)
+        if handler is not None:
+            await handler(self, query, rest)
+    
+    async def _on_select_language(self, query, rest: str):
+        """Handle language selection"""
+        selection = self._LANGUAGE_SELECTIONS.get(rest)
+        if selection is None:
+            return
+        
+        language, confirmation = selection
         user_id = query.from_user.id
+        localization.set_user_language(user_id, language)
+        await query.edit_message_text(confirmation)
+        # Show interview selection after language is set
+        await asyncio.sleep(1)
         username = query.from_user.username or query.from_user.first_name
-        
-        # Handle language selection
-        if query.data == "select_lang_en":
-            localization.set_user_language(user_id, SupportedLanguage.ENGLISH)
-            await query.edit_message_text("✅ Language set to English!")
-            # Show interview selection after language is set
-            await asyncio.sleep(1)
-            await self._show_interview_selection_as_new_message(query, user_id, username)
-            return
-            
-        elif query.data == "select_lang_ru":
-            localization.set_user_language(user_id, SupportedLanguage.RUSSIAN)
-            await query.edit_message_text("✅ Язык установлен на русский!")
-            # Show interview selection after language is set
-            await asyncio.sleep(1)
-            await self._show_interview_selection_as_new_message(query, user_id, username)
+        await self._show_interview_selection_as_new_message(query, user_id, username)
+    
+    async def _on_prompt(self, query, variant_value: str):
+        """Handle prompt selection"""
+        try:
+            variant = PromptVariant(variant_value)
+        except ValueError:
+            await query.edit_message_text("Invalid prompt selection. Please try again.")
             return
         
-        elif query.data.startswith("prompt_"):
-            # Prompt selection
-            variant_value = query.data.replace("prompt_", "")
-            try:
-                variant = PromptVariant(variant_value)
-                await self._start_interview(query, user_id, username, variant)
-            except ValueError:
-                await query.edit_message_text("Invalid prompt selection. Please try again.")
-                
-        elif query.data == "learn_more":
+        username = query.from_user.username or query.from_user.first_name
+        await self._start_interview(query, query.from_user.id, username, variant)
+    
+    async def _on_learn(self, query, rest: str):
+        """Handle "learn_more" button"""
+        if rest == "more":
             await self._show_prompt_details(query)
-        elif query.data == "start_interview":
-            await self._begin_interview(query, user_id)
+    
+    async def _on_start(self, query, rest: str):
+        """Handle "start_interview" button"""
+        if rest == "interview":
+            await self._begin_interview(query, query.from_user.id)
+    
+    _LANGUAGE_SELECTIONS = {
+        "lang_en": (SupportedLanguage.ENGLISH, "✅ Language set to English!"),
+        "lang_ru": (SupportedLanguage.RUSSIAN, "✅ Язык установлен на русский!")
+    }
+    _CALLBACKS = {
+        "select": _on_select_language,
+        "prompt": _on_prompt,
+        "learn": _on_learn,
+        "start": _on_start
+    }
     
     async def _show_prompt_details(self, query):
         """Show details about prompt variants"""
@@ -450,16 +901,7 @@ Please select your preferred language:
 Select your preferred style to begin!
 """
         
-        keyboard = [
-            [InlineKeyboardButton("🎯 Master", callback_data=f"prompt_{PromptVariant.MASTER.value}"),
-             InlineKeyboardButton("📱 Telegram", callback_data=f"prompt_{PromptVariant.TELEGRAM_OPTIMIZED.value}")],
-            [InlineKeyboardButton("💬 Conversational", callback_data=f"prompt_{PromptVariant.CONVERSATIONAL.value}"),
-             InlineKeyboardButton("🎪 Stage Specific", callback_data=f"prompt_{PromptVariant.STAGE_SPECIFIC.value}")],
-            [InlineKeyboardButton("🧠 Conversation Mgmt", callback_data=f"prompt_{PromptVariant.CONVERSATION_MGMT.value}")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await query.edit_message_text(details, reply_markup=reply_markup, parse_mode='Markdown')
+        await query.edit_message_text(details, reply_markup=self._DETAIL_MARKUP, parse_mode='Markdown')
     
     async def _start_interview(self, query, user_id: int, username: str, variant: PromptVariant):
         """Initialize interview session"""
@@ -471,8 +913,7 @@ Select your preferred style to begin!
             current_stage=InterviewStage.GREETING,
             stage_completeness={},
             conversation_history=[],
-            start_time=datetime.now(),
-            last_activity=datetime.now()
+            start_time=datetime.now()
         )
         
         self.sessions[user_id] = session
@@ -496,19 +937,15 @@ Select your preferred style to begin!
 **Ready to begin?** Click below to start your interview!
 """
         
-        keyboard = [[InlineKeyboardButton("🚀 Begin Interview", callback_data="start_interview")]]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await query.edit_message_text(confirmation_message, reply_markup=reply_markup, parse_mode='Markdown')
+        await query.edit_message_text(confirmation_message, reply_markup=self._BEGIN_MARKUP, parse_mode='Markdown')
     
     async def _begin_interview(self, query, user_id: int):
         """Begin the actual interview"""
-        if user_id not in self.sessions:
+        session = self.sessions.touch(user_id)
+        if session is None:
             await query.edit_message_text("Session expired. Please use /start to begin again.")
             return
         
-        session = self.sessions[user_id]
-        
         # Generate first question with language-appropriate message
         user_language = localization.get_user_language(user_id)
         ready_message = "Я готов начать интервью" if user_language.value == "ru" else "I'm ready to begin the interview"
@@ -520,7 +957,7 @@ Select your preferred style to begin!
         )
         
         # Update session state
-        session.add_message("assistant", initial_response['response'], initial_response.get('metadata'))
+        session.add_message("assistant", initial_response['response'], initial_response.get('metadata'), store=self.conversation_store)
         
         interview_started_msg = t("interview_started", user_id)
         await query.edit_message_text(
@@ -533,30 +970,65 @@ Select your preferred style to begin!
         user_id = update.effective_user.id
         user_message = update.message.text
         
-        if user_id not in self.sessions:
+        session = self.sessions.touch(user_id)
+        if session is None:
             await update.message.reply_text(
                 "No active interview session. Please use /start to begin an interview."
             )
             return
         
-        session = self.sessions[user_id]
+        # Hand the turn to a worker before anything else awaits, then show typing
+        await self._enqueue_turn(session, update, user_message)
+        await context.bot.send_chat_action(chat_id=update.effective_chat.id, action='typing')
+    
+    async def _enqueue_turn(self, session: InterviewSession, update: Update, user_message: str,
+                            metadata: Optional[Dict] = None):
+        """Queue a user turn on its user's worker
         
-        # Add user message to history
-        session.add_message("user", user_message)
+        Call this before the handler's first other await: put() only suspends
+        when the queue is full, and then waits in arrival order, so each
+        user's turns reach the worker in the order they came in.
+        """
+        queue = self._response_queues[session.user_id % RESPONSE_WORKERS]
+        await queue.put((session, update, user_message, metadata))
+    
+    async def _respond_to_message(self, session: InterviewSession, update: Update, user_message: str,
+                                  metadata: Optional[Dict] = None):
+        """Record a user turn, generate Claude's reply showing a draft while it streams, and send it
         
-        # Show typing indicator
-        await context.bot.send_chat_action(chat_id=update.effective_chat.id, action='typing')
+        Runs on the user's worker, so the history only ever holds turns that
+        were answered or are being answered.
+        """
+        session.add_message("user", user_message, metadata, store=self.conversation_store)
+        preview: Optional[Message] = None
+        
+        async def show_partial(text: str):
+            nonlocal preview
+            try:
+                if preview is None:
+                    preview = await update.message.reply_text(text)
+                else:
+                    await preview.edit_text(text)
+            except TelegramError as e:
+                # The draft is best effort; the final reply is still sent
+                logger.debug(f"Failed to update streaming preview: {e}")
         
-        # Generate response
         response_data = await self.claude.generate_interview_response(
-            session, user_message, self.prompt_manager
+            session, user_message, self.prompt_manager, on_partial=show_partial
         )
+        await self._apply_response(session, update, response_data, preview)
+    
+    async def _apply_response(self, session: InterviewSession, update: Update, response_data: Dict,
+                              preview: Optional[Message] = None) -> bool:
+        """Update session from Claude response and reply; returns True on stage transition
         
+        If preview holds a streamed draft of the reply it is edited into the final text.
+        """
         # Update session state from response metadata
         if 'metadata' in response_data:
             metadata = response_data['metadata']
             session.question_depth = metadata.get('question_depth', session.question_depth)
-            session.engagement_level = metadata.get('engagement_level', session.engagement_level)
+            session.engagement_level = Engagement.from_metadata(metadata.get('engagement_level'), session.engagement_level)
             
             # Update stage completeness
             stage = response_data.get('interview_stage', session.current_stage.value)
@@ -565,18 +1037,35 @@ Select your preferred style to begin!
             
             # Check for stage transitions
             if completeness >= 80:
+                if preview is not None:
+                    await self._delete_preview(preview)
                 await self._handle_stage_transition(session, update, response_data)
-                return
+                return True
         
         # Add response to history
-        session.add_message("assistant", response_data['response'], response_data.get('metadata'))
+        session.add_message("assistant", response_data['response'], response_data.get('metadata'), store=self.conversation_store)
         
         # Send response to user
         response_text = response_data['response']
         if 'error' in response_data:
             response_text += f"\n\n*[Technical issue: {response_data['error']}]*"
         
-        await update.message.reply_text(response_text, parse_mode='Markdown')
+        if preview is None:
+            await update.message.reply_text(response_text, parse_mode='Markdown')
+        else:
+            try:
+                await preview.edit_text(response_text, parse_mode='Markdown')
+            except BadRequest as e:
+                if "not modified" not in str(e).lower():
+                    raise
+        return False
+    
+    async def _delete_preview(self, preview: Message):
+        """Remove a streamed draft that is superseded by another message"""
+        try:
+            await preview.delete()
+        except TelegramError as e:
+            logger.debug(f"Failed to delete streaming preview: {e}")
     
     async def handle_voice_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle voice messages by transcribing and processing as text"""
@@ -589,17 +1078,19 @@ Select your preferred style to begin!
         user_id = update.effective_user.id
         
         # Check if user has an active session
-        if user_id not in self.sessions:
+        if self.sessions.touch(user_id) is None:
             await update.message.reply_text(
                 "🎤 Please start an interview first using /start to send voice messages."
             )
             return
         
         try:
-            # Show processing indicator
-            await context.bot.send_chat_action(chat_id=update.effective_chat.id, action='typing')
-            await update.message.reply_text(
-                "🎤 Processing your voice message... This may take a moment."
+            # Show processing indicator; both calls are independent
+            await asyncio.gather(
+                context.bot.send_chat_action(chat_id=update.effective_chat.id, action='typing'),
+                update.message.reply_text(
+                    "🎤 Processing your voice message... This may take a moment."
+                )
             )
             
             # Process voice message
@@ -621,7 +1112,13 @@ Select your preferred style to begin!
             if transcription_result.text.strip():
                 # Update the message text to be the transcribed text for processing
                 # We'll simulate a text message with the transcribed content
-                session = self.sessions[user_id]
+                # The session may have been evicted or reset while transcribing
+                session = self.sessions.touch(user_id)
+                if session is None:
+                    await update.message.reply_text(
+                        "🎤 Please start an interview first using /start to send voice messages."
+                    )
+                    return
                 
                 # Add voice message metadata to session
                 voice_metadata = {
@@ -633,39 +1130,8 @@ Select your preferred style to begin!
                     'processing_time': transcription_result.processing_time_seconds
                 }
                 
-                # Add user message to history with voice metadata
-                session.add_message("user", transcription_result.text, voice_metadata)
-                
-                # Generate response
-                response_data = await self.claude.generate_interview_response(
-                    session, transcription_result.text, self.prompt_manager
-                )
-                
-                # Update session state from response metadata
-                if 'metadata' in response_data:
-                    metadata = response_data['metadata']
-                    session.question_depth = metadata.get('question_depth', session.question_depth)
-                    session.engagement_level = metadata.get('engagement_level', session.engagement_level)
-                    
-                    # Update stage completeness
-                    stage = response_data.get('interview_stage', session.current_stage.value)
-                    completeness = metadata.get('completeness', 0)
-                    session.stage_completeness[stage] = completeness
-                    
-                    # Check for stage transitions
-                    if completeness >= 80:
-                        await self._handle_stage_transition(session, update, response_data)
-                        return
-                
-                # Add response to history
-                session.add_message("assistant", response_data['response'], response_data.get('metadata'))
-                
-                # Send response to user
-                response_text = response_data['response']
-                if 'error' in response_data:
-                    response_text += f"\n\n*[Technical issue: {response_data['error']}]*"
-                
-                await update.message.reply_text(response_text, parse_mode='Markdown')
+                # Answer the transcript on the user's worker, in order with their text turns
+                await self._enqueue_turn(session, update, transcription_result.text, voice_metadata)
             
         except Exception as e:
             logger.error(f"Voice message processing failed: {e}")
@@ -675,41 +1141,31 @@ Select your preferred style to begin!
     
     async def _handle_stage_transition(self, session: InterviewSession, update: Update, response_data: Dict):
         """Handle transition between interview stages"""
-        current_stage_index = list(InterviewStage).index(session.current_stage)
+        current_stage = session.current_stage
+        current_stage_index = _STAGE_INDEX[current_stage]
         
         # Check if this is the last stage
-        if current_stage_index >= len(InterviewStage) - 1:
+        if current_stage_index >= len(_STAGES) - 1:
             await self._complete_interview(session, update)
             return
         
         # Move to next stage
-        next_stage = list(InterviewStage)[current_stage_index + 1]
+        next_stage = _STAGES[current_stage_index + 1]
         session.current_stage = next_stage
         session.question_depth = 1  # Reset depth for new stage
         
         # Notify user of stage transition
-        stage_names = {
-            InterviewStage.PROFILING: "Profiling (Background)",
-            InterviewStage.ESSENCE: "Essence (Role Philosophy)", 
-            InterviewStage.OPERATIONS: "Operations (Work Processes)",
-            InterviewStage.EXPERTISE_MAP: "Expertise Map (Knowledge Levels)",
-            InterviewStage.FAILURE_MODES: "Failure Modes (Common Mistakes)",
-            InterviewStage.MASTERY: "Mastery (Expert Insights)",
-            InterviewStage.GROWTH_PATH: "Growth Path (Development)",
-            InterviewStage.WRAP_UP: "Wrap Up (Final Questions)"
-        }
-        
         transition_message = f"""
 📊 **Stage Complete!** 
 
-✅ Previous stage finished with {session.stage_completeness[list(InterviewStage)[current_stage_index].value]}% completeness
+✅ Previous stage finished with {session.stage_completeness[current_stage.value]}% completeness
 
-🎯 **Moving to:** {stage_names.get(next_stage, next_stage.value)}
+🎯 **Moving to:** {_STAGE_NAMES.get(next_stage, next_stage.value)}
 
 {response_data['response']}
 """
         
-        session.add_message("assistant", response_data['response'], response_data.get('metadata'))
+        session.add_message("assistant", response_data['response'], response_data.get('metadata'), store=self.conversation_store)
         await update.message.reply_text(transition_message, parse_mode='Markdown')
     
     async def _complete_interview(self, session: InterviewSession, update: Update):
@@ -722,14 +1178,14 @@ Select your preferred style to begin!
 
 **Session Summary:**
 • Duration: {duration.total_seconds() // 60:.0f} minutes
-• Messages exchanged: {len(session.conversation_history)}
+• Messages exchanged: {session.message_count}
 • Examples collected: {session.examples_collected}
 • Key insights: {len(session.key_insights)}
 
 **Stages Completed:**
 """
         
-        for stage in InterviewStage:
+        for stage in _STAGES:
             completeness = session.stage_completeness.get(stage.value, 0)
             status = "✅" if completeness >= 80 else "⚠️" if completeness >= 50 else "❌"
             summary += f"{status} {stage.value.title()}: {completeness}%\n"
@@ -746,34 +1202,38 @@ Use /reset to start a new interview or /status to review this session.
         """Show current interview status"""
         user_id = update.effective_user.id
         
-        if user_id not in self.sessions:
+        session = self.sessions.touch(user_id)
+        if session is None:
             await update.message.reply_text("No active interview session.")
             return
-        
-        session = self.sessions[user_id]
+
         current_time = datetime.now()
         duration = current_time - session.start_time
+        current_stage = session.current_stage
+        completeness = session.stage_completeness
+        
+        progress_parts = []
+        for i, stage in enumerate(_STAGES):
+            value = completeness.get(stage.value, 0)
+            if stage == current_stage:
+                progress_parts += (_STAGE_CURRENT_PREFIXES[i], str(value), "%\n")
+            elif value > 0:
+                progress_parts += (_STAGE_DONE_PREFIXES[i], str(value), "%\n")
+            else:
+                progress_parts.append(_STAGE_PENDING_LINES[i])
+        progress = "".join(progress_parts)
         
         status_message = f"""
 📊 **Interview Status**
 
-**Current Stage:** {session.current_stage.value.title()}
+**Current Stage:** {_STAGE_TITLES[_STAGE_INDEX[current_stage]]}
 **Duration:** {duration.total_seconds() // 60:.0f} minutes
 **Question Depth:** {session.question_depth}/4
-**Engagement:** {session.engagement_level}
+**Engagement:** {session.engagement_level.label}
 **Examples:** {session.examples_collected}
 
 **Progress:**
-"""
-        
-        for stage in InterviewStage:
-            completeness = session.stage_completeness.get(stage.value, 0)
-            if stage == session.current_stage:
-                status_message += f"▶️ **{stage.value.title()}**: {completeness}%\n"
-            elif completeness > 0:
-                status_message += f"✅ {stage.value.title()}: {completeness}%\n"
-            else:
-                status_message += f"⏳ {stage.value.title()}: 0%\n"
+{progress}"""
         
         await update.message.reply_text(status_message, parse_mode='Markdown')
     
@@ -790,27 +1250,7 @@ Use /reset to start a new interview or /status to review this session.
     
     async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Show help information"""
-        help_text = """
-🤖 **AI Interviewer Bot Commands**
-
-**/start** - Begin new interview
-**/status** - Check current progress  
-**/reset** - Reset current session
-**/help** - Show this help
-
-**Interview Process:**
-This bot conducts structured professional interviews to extract your expertise and knowledge. The process follows 9 stages from greeting to completion.
-
-**Tips for Best Results:**
-• Provide detailed, specific responses
-• Share concrete examples from your experience
-• Be open about your professional challenges
-• Take your time - quality over speed
-
-**Interview typically takes 90-120 minutes**
-"""
-        
-        await update.message.reply_text(help_text, parse_mode='Markdown')
+        await update.message.reply_text(self._HELP_TEXT, parse_mode='Markdown')
     
     async def setup_bot_commands(self):
         """Setup bot commands menu in Telegram"""
@@ -827,17 +1267,18 @@ This bot conducts structured professional interviews to extract your expertise a
         """Run the bot"""
         logger.info("Starting AI Interviewer Bot...")
         
-        # Setup commands menu
-        async def setup_commands():
-            await self.setup_bot_commands()
-        
-        # Run setup then start polling
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        loop.run_until_complete(setup_commands())
-        
-        # Start polling
-        self.application.run_polling()
+        # Use uvloop for the loop run_polling drives
+        if UVLOOP_AVAILABLE:
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        asyncio.set_event_loop(asyncio.new_event_loop())
+        
+        # Bot commands are set from post_init on the polling loop. Only the update
+        # types handled here are requested, with each long poll held open for 30s.
+        self.application.run_polling(
+            allowed_updates=[Update.MESSAGE, Update.CALLBACK_QUERY],
+            poll_interval=0.0,
+            timeout=30
+        )
 
 def main():
     """Main function"""
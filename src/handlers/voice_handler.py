@@ -64,31 +64,116 @@ Compatible with AssemblyAI Python SDK v0.43.1+ and maintains backward compatibil
 with existing VoiceTranscriptionResult structure and async interfaces.
 """
 
+from __future__ import annotations
+
 import asyncio
+import importlib.util
 import json
 import logging
 import os
+import re
+import shutil
 import tempfile
 import traceback
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any
 import time
 import hashlib
 import mimetypes
+import struct
+import sys
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import partial
 from enum import Enum
 
-import assemblyai as aai
+import aiofiles
 import structlog
 from telegram import Update, File
 from telegram.ext import ContextTypes
 import httpx
-from pydub import AudioSegment
-from pydub.exceptions import CouldntDecodeError
+
+def _lazy_import(name: str):
+    """
+    Import a module now but run its body on first attribute access
+    
+    Keeps the AssemblyAI SDK and pydub off the bot's startup path. A missing
+    module still raises ImportError here, at import time.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named '{name}'", name=name)
+    
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+aai = _lazy_import("assemblyai")
+pydub = _lazy_import("pydub")
+
+try:
+    import aiohttp
+    from aiohttp import web
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+# Sample processing for the pydub fallback: SciPy filtering and soxr resampling, both on NumPy
+try:
+    import numpy as np
+except ImportError:
+    SCIPY_AVAILABLE = SOXR_AVAILABLE = False
+else:
+    try:
+        from scipy.signal import butter, sosfiltfilt
+        SCIPY_AVAILABLE = True
+    except ImportError:
+        SCIPY_AVAILABLE = False
+    try:
+        import soxr
+        SOXR_AVAILABLE = True
+    except ImportError:
+        SOXR_AVAILABLE = False
 
 logger = structlog.get_logger()
 
+# Convert with FFmpeg directly when it is on PATH; pydub is the fallback
+FFMPEG_PATH = shutil.which("ffmpeg")
+FFPROBE_PATH = shutil.which("ffprobe")
+# High-pass at 100 Hz, then peak-normalize to 0.1 dB below full scale, like
+# the pydub/SciPy path. The peak is measured by a volumedetect pass first.
+FFMPEG_HIGHPASS = "highpass=f=100"
+NORMALIZE_HEADROOM_DB = 0.1
+_MAX_VOLUME_RE = re.compile(rb"max_volume: (-?[\d.]+) dB")
+
+# Voice files are streamed to disk in chunks of this size
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Errors that will fail the same way on every attempt; anything else is retried
+NON_RETRYABLE_ERROR_RE = re.compile(
+    "api key|unauthorized|authentication|file size|too large|"
+    "unsupported format|invalid audio|bad request|forbidden",
+    re.IGNORECASE
+)
+
+# Webhook callbacks kept for transcripts that nobody is waiting on yet
+WEBHOOK_EARLY_LIMIT = 256
+
+class RetryableError(Exception):
+    """Transcription failure that may succeed on another attempt"""
+
+class NonRetryableError(Exception):
+    """Transcription failure that will repeat on every attempt"""
+
 class VoiceQuality(Enum):
     """Voice transcription quality levels"""
     HIGH = "high"
@@ -105,6 +190,31 @@ class AudioFormat(Enum):
     WEBM = "webm"
     OPUS = "opus"
 
+def _find_word_spans(text: str, words: List[str]) -> Dict[str, List[Tuple[int, int]]]:
+    """
+    Whole-word, case-insensitive (start, end) matches of each query word
+    
+    All words are found in one regex pass over the text. If one query word
+    contains another, both can match at the same position and a single pass
+    would report only one, so each word is then scanned separately.
+    """
+    text_lower = text.lower()
+    lowered = {word: word.lower() for word in words}
+    unique = sorted(set(lowered.values()), key=len, reverse=True)
+    spans: Dict[str, List[Tuple[int, int]]] = {word: [] for word in unique}
+    
+    nested = any(shorter in longer for i, longer in enumerate(unique) for shorter in unique[i + 1:])
+    if len(unique) > 1 and not nested:
+        # Zero-width lookahead so matches that overlap without nesting are all found
+        pattern = re.compile(r'(?=\b(' + '|'.join(map(re.escape, unique)) + r')\b)')
+        for match in pattern.finditer(text_lower):
+            spans[match.group(1)].append(match.span(1))
+    else:
+        for word in unique:
+            spans[word] = [m.span() for m in re.finditer(r'\b' + re.escape(word) + r'\b', text_lower)]
+    
+    return {word: spans[lowered[word]] for word in words}
+
 @dataclass
 class VoiceTranscriptionResult:
     """Result of voice transcription with enhanced features"""
@@ -126,25 +236,14 @@ class VoiceTranscriptionResult:
         
         # This would be implemented using the transcript object
         # For now, return basic text search
-        results = {}
-        text_lower = self.text.lower()
-        
-        for word in words:
-            word_lower = word.lower()
-            results[word] = []
-            
-            # Simple text search (in production, use actual word search API)
-            import re
-            matches = list(re.finditer(r'\b' + re.escape(word_lower) + r'\b', text_lower))
-            for match in matches:
-                results[word].append({
-                    'text': word,
-                    'start_char': match.start(),
-                    'end_char': match.end(),
-                    'count': len(matches)
-                })
-        
-        return results
+        # Simple text search (in production, use actual word search API)
+        return {
+            word: [
+                {'text': word, 'start_char': start, 'end_char': end, 'count': len(spans)}
+                for start, end in spans
+            ]
+            for word, spans in _find_word_spans(self.text, words).items()
+        }
     
     def get_summary(self) -> Optional[str]:
         """Get transcript summary if available"""
@@ -208,6 +307,9 @@ class VoiceProcessingConfig:
     retry_attempts: int = 3
     retry_delay_seconds: float = 2.0
     max_retry_delay: float = 60.0
+    # Completion callback; transcripts are awaited instead of polled while
+    # create_webhook_app() is serving it
+    webhook_url: Optional[str] = None
     
     def __post_init__(self):
         if self.supported_languages is None:
@@ -215,12 +317,51 @@ class VoiceProcessingConfig:
         if self.pii_redaction_policies is None:
             self.pii_redaction_policies = ["person_name", "phone_number", "email_address"]
 
+# Bytes read from each end of an Ogg file to find the codec and final pages
+OGG_SCAN_BYTES = 64 * 1024
+
+def ogg_duration(path: Path) -> float:
+    """
+    Duration of an Ogg Opus/Vorbis file from its first and last pages only
+    
+    The last page's granule position is the stream's final sample, so there
+    is no need to read or decode the whole container. Returns 0.0 for files
+    that are not Ogg Opus/Vorbis. Blocking; run it in an executor.
+    """
+    with open(path, 'rb') as f:
+        head = f.read(OGG_SCAN_BYTES)
+        size = f.seek(0, os.SEEK_END)
+        f.seek(max(0, size - OGG_SCAN_BYTES))
+        tail = f.read()
+    
+    if len(head) < 28 or not head.startswith(b'OggS'):
+        return 0.0
+    
+    # The first packet follows the 27-byte page header and its segment table
+    packet = 27 + head[26]
+    if head.startswith(b'OpusHead', packet):
+        sample_rate = 48000  # Opus granules always count 48 kHz samples
+        pre_skip = struct.unpack_from('<H', head, packet + 10)[0]
+    elif head.startswith(b'\x01vorbis', packet):
+        sample_rate = struct.unpack_from('<I', head, packet + 12)[0]
+        pre_skip = 0
+    else:
+        return 0.0
+    
+    last_page = tail.rfind(b'OggS')
+    if last_page < 0 or last_page + 14 > len(tail) or not sample_rate:
+        return 0.0
+    
+    granule = struct.unpack_from('<q', tail, last_page + 6)[0]
+    return max(granule - pre_skip, 0) / sample_rate
+
 class AudioProcessor:
     """Audio file processing and optimization"""
     
     def __init__(self):
         self.temp_dir = Path(tempfile.gettempdir()) / "ai_interviewer_audio"
         self.temp_dir.mkdir(exist_ok=True)
+        self._http: Optional["aiohttp.ClientSession"] = None
     
     async def download_voice_message(self, file: File, user_id: int, mime_type: str = "audio/ogg") -> Path:
         """Download voice message from Telegram"""
@@ -235,9 +376,13 @@ class AudioProcessor:
             output_path = self.temp_dir / f"voice_{user_id}_{file_hash}.{extension}"
             
             # Download file
-            start_time = time.time()
-            await file.download_to_drive(output_path)
-            download_time = time.time() - start_time
+            start_time = time.perf_counter()
+            file_url = getattr(file, "file_path", None) or ""
+            if AIOHTTP_AVAILABLE and file_url.startswith(("http://", "https://")):
+                await self._stream_to_path(file_url, output_path)
+            else:
+                await file.download_to_drive(output_path)
+            download_time = time.perf_counter() - start_time
             
             logger.info("Voice message downloaded",
                        user_id=user_id,
@@ -255,6 +400,28 @@ class AudioProcessor:
                         error=str(e))
             raise
     
+    async def _stream_to_path(self, url: str, output_path: Path):
+        """Write a download to disk chunk by chunk instead of holding the whole file in memory"""
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=120))
+        
+        try:
+            async with self._http.get(url) as response:
+                response.raise_for_status()
+                # aiofiles runs the writes on a thread so disk I/O stays off the loop
+                async with aiofiles.open(output_path, 'wb') as out:
+                    async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                        await out.write(chunk)
+        except BaseException:
+            output_path.unlink(missing_ok=True)
+            raise
+    
+    async def close(self):
+        """Close the download connection pool"""
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+    
     def _mime_to_extension(self, mime_type: str) -> str:
         """Convert MIME type to file extension"""
         mime_to_ext = {
@@ -269,9 +436,12 @@ class AudioProcessor:
     
     async def convert_and_optimize(self, input_path: Path) -> Tuple[Path, Dict[str, Any]]:
         """Convert audio to optimal format for AssemblyAI"""
+        if FFMPEG_PATH and FFPROBE_PATH:
+            return await self._convert_with_ffmpeg(input_path)
+        
         try:
             # Load audio file
-            audio = AudioSegment.from_file(str(input_path))
+            audio = pydub.AudioSegment.from_file(str(input_path))
             
             # Get original metadata
             original_metadata = {
@@ -288,13 +458,13 @@ class AudioProcessor:
             output_path = input_path.with_suffix('.wav')
             
             # Export optimized audio
-            start_time = time.time()
+            start_time = time.perf_counter()
             optimized_audio.export(
                 str(output_path),
                 format="wav",
                 parameters=["-ar", "16000", "-ac", "1"]  # 16kHz mono
             )
-            processing_time = time.time() - start_time
+            processing_time = time.perf_counter() - start_time
             
             # Get optimized metadata
             optimized_metadata = {
@@ -313,14 +483,98 @@ class AudioProcessor:
             
             return output_path, {**original_metadata, **optimized_metadata}
             
-        except CouldntDecodeError as e:
+        except pydub.exceptions.CouldntDecodeError as e:
             logger.error("Audio decoding failed", path=str(input_path), error=str(e))
             raise ValueError(f"Unsupported audio format: {e}")
         except Exception as e:
             logger.error("Audio conversion failed", path=str(input_path), error=str(e))
             raise
     
-    async def _optimize_audio(self, audio: AudioSegment) -> AudioSegment:
+    async def _convert_with_ffmpeg(self, input_path: Path) -> Tuple[Path, Dict[str, Any]]:
+        """Probe, downmix, resample and filter in FFmpeg subprocesses without decoding in Python"""
+        output_path = input_path.with_suffix('.wav')
+        try:
+            original_metadata = await self._probe_audio(input_path)
+            
+            start_time = time.perf_counter()
+            gain_db = await self._normalize_gain_db(input_path)
+            await self._run_ffmpeg(
+                FFMPEG_PATH, "-nostdin", "-v", "error", "-y",
+                "-i", str(input_path),
+                "-ac", "1", "-ar", "16000", "-af", f"{FFMPEG_HIGHPASS},volume={gain_db:.1f}dB",
+                "-f", "wav", str(output_path)
+            )
+            processing_time = time.perf_counter() - start_time
+            
+            output_size = output_path.stat().st_size
+            optimized_metadata = {
+                "duration": original_metadata["duration"],
+                "channels": 1,
+                "frame_rate": 16000,
+                "format": "wav",
+                "processing_time": processing_time,
+                "size_bytes": output_size,
+                "compression_ratio": output_size / input_path.stat().st_size
+            }
+            
+            logger.info("Audio conversion complete",
+                       original=original_metadata,
+                       optimized=optimized_metadata)
+            
+            return output_path, {**original_metadata, **optimized_metadata}
+            
+        except Exception as e:
+            logger.error("Audio conversion failed", path=str(input_path), error=str(e))
+            if output_path != input_path:
+                output_path.unlink(missing_ok=True)
+            raise
+    
+    async def _normalize_gain_db(self, input_path: Path) -> float:
+        """Gain that brings the filtered mono 16 kHz signal's peak to the normalization target"""
+        _, stderr = await self._run_ffmpeg(
+            FFMPEG_PATH, "-nostdin", "-hide_banner", "-nostats", "-v", "info",
+            "-i", str(input_path),
+            "-ac", "1", "-ar", "16000", "-af", f"{FFMPEG_HIGHPASS},volumedetect",
+            "-f", "null", "-"
+        )
+        match = _MAX_VOLUME_RE.search(stderr)
+        if match is None:
+            return 0.0
+        return -NORMALIZE_HEADROOM_DB - float(match.group(1))
+    
+    async def _probe_audio(self, input_path: Path) -> Dict[str, Any]:
+        """Read duration, channels and sample rate of the first audio stream with one ffprobe call"""
+        output, _ = await self._run_ffmpeg(
+            FFPROBE_PATH, "-v", "error", "-select_streams", "a:0",
+            "-show_entries", "stream=channels,sample_rate:format=duration",
+            "-of", "json", str(input_path)
+        )
+        probe = json.loads(output)
+        streams = probe.get("streams") or []
+        if not streams:
+            raise ValueError("Unsupported audio format: no audio stream found")
+        
+        return {
+            "duration": float(probe.get("format", {}).get("duration") or 0.0),
+            "channels": int(streams[0].get("channels", 0)),
+            "frame_rate": int(streams[0].get("sample_rate", 0)),
+            "format": input_path.suffix[1:].lower()
+        }
+    
+    async def _run_ffmpeg(self, *args: str) -> Tuple[bytes, bytes]:
+        """Run an FFmpeg tool and return its stdout and stderr, raising ValueError if it fails"""
+        process = await asyncio.create_subprocess_exec(
+            *args,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await process.communicate()
+        if process.returncode != 0:
+            raise ValueError(f"Unsupported audio format: {stderr.decode(errors='replace').strip()}")
+        return stdout, stderr
+    
+    async def _optimize_audio(self, audio: pydub.AudioSegment) -> pydub.AudioSegment:
         """Optimize audio for transcription quality"""
         # Convert to mono
         if audio.channels > 1:
@@ -328,7 +582,10 @@ class AudioProcessor:
         
         # Normalize sample rate to 16kHz (optimal for speech recognition)
         if audio.frame_rate != 16000:
-            audio = audio.set_frame_rate(16000)
+            audio = self._resample(audio, 16000)
+        
+        if SCIPY_AVAILABLE:
+            return self._filter_and_normalize_samples(audio)
         
         # Apply noise reduction and normalization
         # Normalize volume
@@ -340,17 +597,50 @@ class AudioProcessor:
         
         return filtered_audio
     
+    def _resample(self, audio: pydub.AudioSegment, frame_rate: int) -> pydub.AudioSegment:
+        """Resample with soxr's polyphase filter if installed, else pydub's audioop"""
+        if not SOXR_AVAILABLE:
+            return audio.set_frame_rate(frame_rate)
+        
+        audio = audio.set_sample_width(2)
+        samples = np.asarray(audio.get_array_of_samples(), dtype=np.float32)
+        resampled = soxr.resample(samples, audio.frame_rate, frame_rate, quality="HQ")
+        return audio._spawn(
+            np.clip(resampled, -32768, 32767).astype(np.int16).tobytes(),
+            overrides={"frame_rate": frame_rate}
+        )
+    
+    def _filter_and_normalize_samples(self, audio: pydub.AudioSegment) -> pydub.AudioSegment:
+        """High-pass filter and peak-normalize the raw samples in one NumPy/SciPy pass"""
+        audio = audio.set_sample_width(2)
+        samples = np.asarray(audio.get_array_of_samples(), dtype=np.float32)
+        
+        # filtfilt pads the signal, so very short clips are left unfiltered
+        sos = butter(4, 100, btype="highpass", fs=audio.frame_rate, output="sos")
+        if samples.size > 3 * (2 * len(sos) + 1):
+            samples = sosfiltfilt(sos, samples).astype(np.float32, copy=False)
+        
+        # Peak-normalize to 0.1 dB below full scale, like AudioSegment.normalize()
+        peak = float(np.max(np.abs(samples))) if samples.size else 0.0
+        if peak > 0:
+            samples *= (32767 * 10 ** (-0.1 / 20)) / peak
+        
+        return audio._spawn(np.clip(samples, -32768, 32767).astype(np.int16).tobytes())
+    
     def cleanup_temp_files(self, max_age_hours: int = 24):
         """Clean up temporary audio files"""
         try:
-            cutoff_time = datetime.now() - timedelta(hours=max_age_hours)
+            cutoff_time = time.time() - max_age_hours * 3600
             cleaned_count = 0
             
-            for file_path in self.temp_dir.glob("voice_*"):
-                if file_path.is_file():
-                    file_mtime = datetime.fromtimestamp(file_path.stat().st_mtime)
-                    if file_mtime < cutoff_time:
-                        file_path.unlink()
+            # DirEntry carries the file type from the directory listing, so only
+            # voice_* files need a stat call
+            with os.scandir(self.temp_dir) as entries:
+                for entry in entries:
+                    if (entry.name.startswith("voice_")
+                            and entry.is_file(follow_symlinks=False)
+                            and entry.stat(follow_symlinks=False).st_mtime < cutoff_time):
+                        os.unlink(entry.path)
                         cleaned_count += 1
             
             if cleaned_count > 0:
@@ -372,12 +662,31 @@ class AssemblyAIClient:
         self._request_semaphore = asyncio.Semaphore(config.concurrent_requests)
         self._last_request_times: List[float] = []
         
+        # Blocking SDK calls run on a bounded pool instead of the loop's default executor
+        self._executor = ThreadPoolExecutor(
+            max_workers=config.concurrent_requests,
+            thread_name_prefix="assemblyai"
+        )
+        
+        # Transcripts waiting for a webhook callback, by transcript id
+        self._pending: Dict[str, asyncio.Future] = {}
+        # Callbacks that arrived before their transcript was registered, oldest first
+        self._early: OrderedDict[str, str] = OrderedDict()
+        # Set while a create_webhook_app application is running
+        self.webhook_serving = False
+        
+        # Built on first use; it depends on self.config and webhook_serving
+        self._transcript_config: Optional[aai.TranscriptionConfig] = None
+        
         # Validate API key
         if not config.assemblyai_api_key or config.assemblyai_api_key == "":
             raise ValueError("AssemblyAI API key is required")
         
         logger.info("AssemblyAI client initialized", 
                    features_enabled=self._get_enabled_features())
+        if config.webhook_url:
+            logger.info("Transcripts are polled until the webhook app is serving",
+                       webhook_url=config.webhook_url)
     
     def _get_enabled_features(self) -> Dict[str, bool]:
         """Get summary of enabled features for logging"""
@@ -394,7 +703,7 @@ class AssemblyAIClient:
     
     async def transcribe_audio(self, audio_path: Path, metadata: Dict[str, Any]) -> VoiceTranscriptionResult:
         """Transcribe audio file with comprehensive error handling"""
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         try:
             # Rate limiting
@@ -409,7 +718,7 @@ class AssemblyAIClient:
             # Perform transcription with retries  
             transcript = await self._transcribe_with_retries(audio_path, transcript_config)
             
-            processing_time = time.time() - start_time
+            processing_time = time.perf_counter() - start_time
             
             # Process result
             result = self._process_transcript_result(transcript, metadata, processing_time)
@@ -424,7 +733,7 @@ class AssemblyAIClient:
             return result
             
         except Exception as e:
-            processing_time = time.time() - start_time
+            processing_time = time.perf_counter() - start_time
             error_type = type(e).__name__
             error_msg = str(e)
             
@@ -467,7 +776,7 @@ class AssemblyAIClient:
     async def _rate_limit(self):
         """Implement rate limiting for API calls"""
         async with self._request_semaphore:
-            current_time = time.time()
+            current_time = time.monotonic()
             
             # Clean old requests (older than 1 minute)
             self._last_request_times = [
@@ -502,6 +811,12 @@ class AssemblyAIClient:
             raise ValueError(f"Audio too long: {duration:.1f}s (max: {self.config.max_duration_seconds}s)")
     
     def _build_transcript_config(self, metadata: Dict[str, Any]) -> aai.TranscriptionConfig:
+        """Transcription configuration for a request, shared by all requests of this client"""
+        if self._transcript_config is None:
+            self._transcript_config = self._new_transcript_config()
+        return self._transcript_config
+    
+    def _new_transcript_config(self) -> aai.TranscriptionConfig:
         """Build transcription configuration using current SDK patterns"""
         config = aai.TranscriptionConfig(
             # Core transcription settings
@@ -526,6 +841,9 @@ class AssemblyAIClient:
             boost_param=self.config.boost_param,
         )
         
+        if self._use_webhook:
+            config.set_webhook(self.config.webhook_url)
+        
         # Set language if not using auto-detection
         if not self.config.enable_auto_language_detection:
             config.language_code = self.config.default_language
@@ -564,23 +882,47 @@ class AssemblyAIClient:
         
         return config
     
+    @property
+    def _use_webhook(self) -> bool:
+        """Callbacks are only requested while something serves them"""
+        return bool(self.config.webhook_url) and self.webhook_serving
+    
+    def set_webhook_serving(self, serving: bool):
+        """Switch between webhook callbacks and polling"""
+        self.webhook_serving = serving
+        # The cached config may carry (or lack) the webhook URL
+        self._transcript_config = None
+    
+    def close(self):
+        """Stop the SDK thread pool, dropping calls that have not started"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+    
+    async def _run_blocking(self, func, *args, **kwargs):
+        """Run a blocking SDK call on the client's thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+    
     async def _transcribe_with_retries(self, audio_path: Path, config: aai.TranscriptionConfig) -> aai.Transcript:
         """Perform transcription with exponential backoff retry logic"""
         last_error = None
         
         for attempt in range(self.config.retry_attempts):
             try:
+                # With a webhook only submit the job; completion arrives as a callback
+                submit = self.transcriber.submit if self._use_webhook else self.transcriber.transcribe
+                
                 # Run transcription in thread pool to avoid blocking
-                transcript = await asyncio.to_thread(
-                    self.transcriber.transcribe,  # Use self.transcriber instead of self.client
+                transcript = await self._run_blocking(
+                    submit,  # Use self.transcriber instead of self.client
                     str(audio_path),
                     config=config
                 )
                 
                 # Check if transcription was successful (using string status, not enum)
                 if transcript.status == "error":
-                    error_msg = getattr(transcript, 'error', 'Unknown transcription error')
-                    raise Exception(f"AssemblyAI transcription error: {error_msg}")
+                    error_msg = getattr(transcript, 'error', None) or 'Unknown transcription error'
+                    error_cls = NonRetryableError if NON_RETRYABLE_ERROR_RE.search(error_msg) else RetryableError
+                    raise error_cls(f"AssemblyAI transcription error: {error_msg}")
                 
                 # Wait for completion if still processing
                 if transcript.status == "processing" or transcript.status == "queued":
@@ -589,7 +931,7 @@ class AssemblyAIClient:
                 if transcript.status == "completed":
                     return transcript
                 else:
-                    raise Exception(f"Transcription finished with status: {transcript.status}")
+                    raise RetryableError(f"Transcription finished with status: {transcript.status}")
                 
             except Exception as e:
                 last_error = e
@@ -609,7 +951,7 @@ class AssemblyAIClient:
                     
                     # Exponential backoff with jitter and max delay
                     base_delay = self.config.retry_delay_seconds * (2 ** attempt)
-                    jitter = base_delay * 0.1 * (0.5 - asyncio.get_event_loop().time() % 1)
+                    jitter = base_delay * 0.1 * (0.5 - asyncio.get_running_loop().time() % 1)
                     wait_time = min(base_delay + jitter, self.config.max_retry_delay)
                     
                     logger.info("Retrying transcription", 
@@ -621,17 +963,20 @@ class AssemblyAIClient:
     
     async def _wait_for_completion(self, transcript: aai.Transcript, max_wait_seconds: int = 300) -> aai.Transcript:
         """Wait for transcript to complete processing"""
-        start_time = time.time()
+        if self._use_webhook:
+            return await self._wait_for_webhook(transcript, max_wait_seconds)
+        
+        start_time = time.perf_counter()
         poll_interval = 2  # Start with 2 second polling
         
         while transcript.status in ["processing", "queued"]:
-            if time.time() - start_time > max_wait_seconds:
+            if time.perf_counter() - start_time > max_wait_seconds:
                 raise TimeoutError(f"Transcription timed out after {max_wait_seconds} seconds")
             
             await asyncio.sleep(poll_interval)
             
             # Refresh transcript status
-            transcript = await asyncio.to_thread(
+            transcript = await self._run_blocking(
                 self.transcriber.get_transcript,
                 transcript.id
             )
@@ -641,33 +986,80 @@ class AssemblyAIClient:
             
             logger.debug("Waiting for transcription completion", 
                         status=transcript.status,
-                        elapsed_time=time.time() - start_time)
+                        elapsed_time=time.perf_counter() - start_time)
         
         return transcript
     
-    def _is_retryable_error(self, error: Exception) -> bool:
-        """Determine if an error is worth retrying"""
-        error_msg = str(error).lower()
+    async def _wait_for_webhook(self, transcript: aai.Transcript, max_wait_seconds: int) -> aai.Transcript:
+        """Wait for the completion webhook, then fetch the finished transcript"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending[transcript.id] = future
         
-        # Non-retryable errors
-        non_retryable_indicators = [
-            "api key", "unauthorized", "authentication",
-            "file size", "too large", "unsupported format",
-            "invalid audio", "bad request", "forbidden"
-        ]
+        # The callback may have arrived while submit() was still returning
+        if self._early.pop(transcript.id, None) is not None:
+            future.set_result(None)
         
-        for indicator in non_retryable_indicators:
-            if indicator in error_msg:
-                return False
+        try:
+            await asyncio.wait_for(future, timeout=max_wait_seconds)
+        except asyncio.TimeoutError:
+            # The callback may have been lost
+            logger.warning("No transcription webhook received, checking status",
+                          transcript_id=transcript.id,
+                          max_wait_seconds=max_wait_seconds)
+        finally:
+            self._pending.pop(transcript.id, None)
         
-        # Retryable errors (network, timeout, server errors)
+        transcript = await self._run_blocking(self.transcriber.get_transcript, transcript.id)
+        if transcript.status in ["processing", "queued"]:
+            raise TimeoutError(f"Transcription timed out after {max_wait_seconds} seconds")
+        
+        return transcript
+    
+    def resolve_webhook(self, transcript_id: str, status: str) -> bool:
+        """Wake the transcription waiting on `transcript_id`; False if none is"""
+        future = self._pending.get(transcript_id)
+        if future is None:
+            # Keep it for a waiter that has not registered yet
+            self._early[transcript_id] = status
+            if len(self._early) > WEBHOOK_EARLY_LIMIT:
+                self._early.popitem(last=False)
+            return False
+        if future.done():
+            return False
+        
+        future.set_result(status)
         return True
     
+    async def handle_webhook(self, request: "web.Request") -> "web.Response":
+        """aiohttp handler for AssemblyAI transcript completion callbacks"""
+        try:
+            payload = await request.json()
+            transcript_id = payload['transcript_id']
+        except (ValueError, KeyError):
+            return web.Response(status=400)
+        
+        resolved = self.resolve_webhook(transcript_id, payload.get('status', ''))
+        logger.debug("Transcription webhook received",
+                    transcript_id=transcript_id,
+                    status=payload.get('status'),
+                    resolved=resolved)
+        return web.Response(status=200)
+    
+    def _is_retryable_error(self, error: Exception) -> bool:
+        """Determine if an error is worth retrying"""
+        if isinstance(error, (RetryableError, httpx.TransportError, TimeoutError)):
+            return True
+        if isinstance(error, NonRetryableError):
+            return False
+        
+        # SDK errors only carry the API's message
+        return NON_RETRYABLE_ERROR_RE.search(str(error)) is None
+    
     async def search_words_in_transcript(self, transcript: aai.Transcript, words: List[str]) -> Dict[str, List[Dict[str, Any]]]:
         """Search for words in transcript using AssemblyAI word search"""
         try:
             # Use AssemblyAI's word search feature
-            search_results = await asyncio.to_thread(
+            search_results = await self._run_blocking(
                 transcript.word_search,
                 words
             )
@@ -697,26 +1089,20 @@ class AssemblyAIClient:
     
     def _basic_word_search(self, text: str, words: List[str]) -> Dict[str, List[Dict[str, Any]]]:
         """Basic word search fallback"""
-        results = {}
-        text_lower = text.lower()
-        
-        for word in words:
-            word_lower = word.lower()
-            results[word] = []
-            
-            import re
-            matches = list(re.finditer(r'\b' + re.escape(word_lower) + r'\b', text_lower))
-            for i, match in enumerate(matches):
-                results[word].append({
+        return {
+            word: [
+                {
                     'text': word,
-                    'start_char': match.start(),
-                    'end_char': match.end(),
+                    'start_char': start,
+                    'end_char': end,
                     'confidence': 1.0,
-                    'count': len(matches),
+                    'count': len(spans),
                     'match_index': i
-                })
-        
-        return results
+                }
+                for i, (start, end) in enumerate(spans)
+            ]
+            for word, spans in _find_word_spans(text, words).items()
+        }
     
     def _process_transcript_result(self, transcript: aai.Transcript, metadata: Dict[str, Any], processing_time: float) -> VoiceTranscriptionResult:
         """Process transcript result and determine quality with enhanced features"""
@@ -843,6 +1229,24 @@ class AssemblyAIClient:
         
         return VoiceQuality.MEDIUM
 
+# Failure replies as (substring of the error, match case-insensitively, template), checked in order
+_FAILURE_TEMPLATES = (
+    ("authentication", False, "🎤❌ API authentication failed. Please check the configuration."),
+    ("timeout", False, "🎤⏱️ Transcription timed out. Please try with a shorter audio file."),
+    ("file_size", False, "🎤📁 File too large ({size_mb:.1f}MB). Please keep under {max_mb}MB."),
+    ("format", False, "🎤🔄 Unsupported audio format. Please try recording in a standard format."),
+    ("network", False, "🎤🌐 Network error occurred. Please check your connection and try again."),
+    ("too short", True, "🎤⚡ Audio too short ({duration:.1f}s). Please speak for at least {min_duration}s."),
+    ("too large", True, "🎤📏 Audio too long ({duration_min:.1f} min). Please keep under {max_duration_min:.0f} minutes."),
+)
+
+# Success reply headers by quality
+_TRANSCRIBED_PREFIXES = {
+    VoiceQuality.HIGH: "🎤✨ **Voice Message Transcribed:**\n\n",
+    VoiceQuality.MEDIUM: "🎤 **Voice Message Transcribed:**\n\n",
+    VoiceQuality.LOW: "🎤⚠️ **Voice Message Transcribed:**\n\n"
+}
+
 class VoiceMessageHandler:
     """Main voice message handler integrating all components"""
     
@@ -879,11 +1283,11 @@ class VoiceMessageHandler:
         try:
             self.stats['messages_processed'] += 1
             
-            # Show processing indicator
-            await context.bot.send_chat_action(chat_id=update.effective_chat.id, action='typing')
-            
-            # Get file object
-            file = await context.bot.get_file(voice.file_id)
+            # Show processing indicator while fetching the file object
+            _, file = await asyncio.gather(
+                context.bot.send_chat_action(chat_id=update.effective_chat.id, action='typing'),
+                context.bot.get_file(voice.file_id)
+            )
             
             # Download voice message
             downloaded_path = await self.audio_processor.download_voice_message(file, user_id, voice.mime_type)
@@ -961,34 +1365,23 @@ class VoiceMessageHandler:
         """Format transcription result for user response with enhanced features"""
         if result.quality == VoiceQuality.FAILED:
             error_msg = result.error or ""
+            error_lower = error_msg.lower()
             
             # Enhanced error messages
-            if "authentication" in error_msg:
-                return "🎤❌ API authentication failed. Please check the configuration."
-            elif "timeout" in error_msg:
-                return "🎤⏱️ Transcription timed out. Please try with a shorter audio file."
-            elif "file_size" in error_msg:
-                return f"🎤📁 File too large ({result.file_size_bytes / 1024 / 1024:.1f}MB). Please keep under {self.config.max_file_size_mb}MB."
-            elif "format" in error_msg:
-                return "🎤🔄 Unsupported audio format. Please try recording in a standard format."
-            elif "network" in error_msg:
-                return "🎤🌐 Network error occurred. Please check your connection and try again."
-            elif "too short" in error_msg.lower():
-                return f"🎤⚡ Audio too short ({result.duration_seconds:.1f}s). Please speak for at least {self.config.min_duration_seconds}s."
-            elif "too large" in error_msg.lower():
-                return f"🎤📏 Audio too long ({result.duration_seconds/60:.1f} min). Please keep under {self.config.max_duration_seconds/60:.0f} minutes."
-            else:
-                return f"🎤❌ Transcription failed: {error_msg}"
+            for needle, ignore_case, template in _FAILURE_TEMPLATES:
+                if needle in (error_lower if ignore_case else error_msg):
+                    return template.format(
+                        size_mb=result.file_size_bytes / 1024 / 1024,
+                        max_mb=self.config.max_file_size_mb,
+                        duration=result.duration_seconds,
+                        min_duration=self.config.min_duration_seconds,
+                        duration_min=result.duration_seconds / 60,
+                        max_duration_min=self.config.max_duration_seconds / 60
+                    )
+            return f"🎤❌ Transcription failed: {error_msg}"
         
         # Success - build response with quality indicator
-        quality_indicators = {
-            VoiceQuality.HIGH: "🎤✨",
-            VoiceQuality.MEDIUM: "🎤",
-            VoiceQuality.LOW: "🎤⚠️"
-        }
-        
-        indicator = quality_indicators.get(result.quality, "🎤")
-        response = f"{indicator} **Voice Message Transcribed:**\n\n{result.text}"
+        response = _TRANSCRIBED_PREFIXES.get(result.quality, _TRANSCRIBED_PREFIXES[VoiceQuality.MEDIUM]) + result.text
         
         # Add confidence notice for low quality
         if result.quality == VoiceQuality.LOW:
@@ -1067,6 +1460,11 @@ class VoiceMessageHandler:
         
         return stats
     
+    async def close(self):
+        """Release network resources and worker threads held by the handler"""
+        await self.audio_processor.close()
+        self.assemblyai_client.close()
+    
     async def cleanup_periodic(self):
         """Periodic cleanup of temporary files"""
         self.audio_processor.cleanup_temp_files(max_age_hours=24)
@@ -1080,6 +1478,29 @@ def create_voice_handler(assemblyai_api_key: str, **kwargs) -> VoiceMessageHandl
     )
     return VoiceMessageHandler(config)
 
+def create_webhook_app(handler: VoiceMessageHandler, path: str = "/assemblyai/webhook") -> "web.Application":
+    """aiohttp application receiving AssemblyAI callbacks for `handler`
+
+    Serve it at the address given as `webhook_url` in the handler's config.
+    Transcripts are polled until the application has started.
+    """
+    if not AIOHTTP_AVAILABLE:
+        raise RuntimeError("aiohttp is required to receive AssemblyAI webhooks")
+    
+    client = handler.assemblyai_client
+    
+    async def on_startup(app):
+        client.set_webhook_serving(True)
+    
+    async def on_cleanup(app):
+        client.set_webhook_serving(False)
+    
+    app = web.Application()
+    app.router.add_post(path, client.handle_webhook)
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
 # Example usage with all new features
 async def example_advanced_usage():
     """Example demonstrating all AssemblyAI SDK features"""
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Localization demo for AI Interviewer Telegram Bot
+Kept out of localization.py so the production module stays lean on import.
+
+Usage:
+    python -m src.localization._demo
+"""
+
+from src.localization.localization import localization, t, set_language, SupportedLanguage
+
+
+def demo_localization():
+    """Demonstrate localization functionality"""
+    lines = ["=== Localization Demo ===", ""]
+    
+    # Test user preferences
+    test_user_en = 12345
+    test_user_ru = 67890
+    
+    # Set languages
+    set_language(test_user_en, SupportedLanguage.ENGLISH)
+    set_language(test_user_ru, SupportedLanguage.RUSSIAN)
+    
+    # Test basic translations
+    lines.append("English welcome:")
+    lines.append(t("welcome_greeting", test_user_en, username="John"))
+    lines.append("")
+    
+    lines.append("Russian welcome:")
+    lines.append(t("welcome_greeting", test_user_ru, username="Иван"))
+    lines.append("")
+    
+    # Test stage names
+    lines.append("Stage names comparison:")
+    stages = ["greeting", "profiling", "essence", "operations"]
+    for stage in stages:
+        en_name = localization.format_stage_name(stage, test_user_en)
+        ru_name = localization.format_stage_name(stage, test_user_ru)
+        lines.append(f"  {stage}: EN='{en_name}' | RU='{ru_name}'")
+    lines.append("")
+    
+    # Test prompt descriptions
+    lines.append("Prompt descriptions:")
+    variants = ["v1_master", "v2_telegram", "v3_conversational"]
+    for variant in variants:
+        en_desc = localization.format_prompt_description(variant, test_user_en)
+        ru_desc = localization.format_prompt_description(variant, test_user_ru)
+        lines.append(f"  {variant}: EN='{en_desc}' | RU='{ru_desc}'")
+    
+    # Single write instead of one print() per line
+    print(*lines, sep="\n")
+
+
+if __name__ == "__main__":
+    demo_localization()
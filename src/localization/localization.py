@@ -6,10 +6,19 @@ Supports English and Russian languages with fallback mechanism.
 
 import os
 import json
-from typing import Dict, Optional, Any, List
+import asyncio
+import logging
+import string
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Optional, Any, Callable, List, Mapping, Tuple
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
+from types import MappingProxyType
+
+logger = logging.getLogger(__name__)
 
 
 class SupportedLanguage(Enum):
@@ -18,6 +27,20 @@ class SupportedLanguage(Enum):
     RUSSIAN = "ru"
 
 
+# Language subtag -> supported language, e.g. 'ru' from 'ru-RU'
+_LOCALE_LANGUAGES: Dict[str, SupportedLanguage] = {language.value: language for language in SupportedLanguage}
+
+# Prompt variant name -> description translation key
+_PROMPT_DESCRIPTION_KEYS: Dict[str, str] = {
+    "v1_master": "prompt_master",
+    "v2_telegram": "prompt_telegram",
+    "v3_conversational": "prompt_conversational",
+    "v4_stage_specific": "prompt_stage_specific",
+    "v5_conversation_mgmt": "prompt_conversation_mgmt"
+}
+_DEFAULT_PROMPT_VARIANT = "v1_master"
+
+
 @dataclass
 class LanguagePreference:
     """User language preference"""
@@ -33,8 +56,14 @@ class LocalizationManager:
     def __init__(self, default_language: SupportedLanguage = SupportedLanguage.ENGLISH):
         self.default_language = default_language
         self.translations = self._load_translations()
+        self._compiled_translations = self._compile_translations(self.translations)
+        self._stage_names, self._prompt_descriptions = self._build_display_tables()
         self.user_preferences: Dict[int, LanguagePreference] = {}
+        # Flat user_id -> language index kept in sync with user_preferences
+        self._user_languages: Dict[int, SupportedLanguage] = {}
         self.preferences_file = Path("user_language_preferences.json")
+        # Single worker keeps preference writes ordered and off the event loop
+        self._preferences_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="l10n-prefs")
         self._load_user_preferences()
     
     def _load_translations(self) -> Dict[str, Dict[str, str]]:
@@ -44,6 +73,49 @@ class LocalizationManager:
             SupportedLanguage.RUSSIAN.value: self._get_russian_translations()
         }
     
+    def _compile_translations(self, translations: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Tuple[str, Optional[Callable[[Mapping[str, Any]], str]]]]]:
+        """
+        Pre-join list entries and parse placeholders once per template
+        
+        Each entry is (text, bound text.format_map), with None in place of the
+        formatter for constant strings. Keys are interned so lookups with literal keys from call sites
+        (which CPython interns already) match on identity.
+        """
+        formatter = string.Formatter()
+        compiled = {}
+        for language_code, catalog in translations.items():
+            entries = {}
+            for key, text in catalog.items():
+                if isinstance(text, list):
+                    text = "\n".join(text)
+                has_fields = any(
+                    field_name is not None for _, field_name, _, _ in formatter.parse(text)
+                )
+                entries[sys.intern(key)] = (text, text.format_map if has_fields else None)
+            # Read-only view: compiled catalogs are shared by every lookup for the process
+            compiled[language_code] = MappingProxyType(entries)
+        return compiled
+    
+    def _build_display_tables(self) -> Tuple[Dict[SupportedLanguage, Dict[str, str]], Dict[SupportedLanguage, Dict[str, str]]]:
+        """Resolve stage names and prompt descriptions for every language up front"""
+        stage_keys = [
+            key[len("stage_"):] for key in self._compiled_translations[self.default_language.value]
+            if key.startswith("stage_")
+        ]
+        
+        stage_names = {}
+        prompt_descriptions = {}
+        for language in SupportedLanguage:
+            stage_names[language] = {
+                stage_key: self.get_text_for_language(f"stage_{stage_key}", language)
+                for stage_key in stage_keys
+            }
+            prompt_descriptions[language] = {
+                variant_name: self.get_text_for_language(key, language)
+                for variant_name, key in _PROMPT_DESCRIPTION_KEYS.items()
+            }
+        return stage_names, prompt_descriptions
+    
     def _get_english_translations(self) -> Dict[str, str]:
         """English translations (base language)"""
         return {
@@ -466,30 +538,37 @@ class LocalizationManager:
         Returns:
             Localized and formatted text
         """
-        # Get user language preference
-        language = self._get_user_language(user_id)
-        
-        # Get translation
-        translations = self.translations.get(language.value, {})
-        text = translations.get(key)
+        return self._format_text(key, self._get_user_language(user_id), kwargs)
+    
+    def get_text_map(self, key: str, user_id: Optional[int] = None, params: Optional[Mapping[str, Any]] = None) -> str:
+        """Get localized text with format arguments passed as a prebuilt mapping"""
+        return self._format_text(key, self._get_user_language(user_id), params)
+    
+    def get_text_for_language(self, key: str, language: SupportedLanguage, **kwargs) -> str:
+        """Get localized text for an already resolved language"""
+        return self._format_text(key, language, kwargs)
+    
+    def _format_text(self, key: str, language: SupportedLanguage, params: Optional[Mapping[str, Any]]) -> str:
+        """Look up a compiled template and apply format arguments if it has placeholders"""
+        # Get compiled translation
+        translations = self._compiled_translations.get(language.value, {})
+        entry = translations.get(key)
         
         # Fallback to default language if not found
-        if text is None and language != self.default_language:
-            fallback_translations = self.translations.get(self.default_language.value, {})
-            text = fallback_translations.get(key)
+        if entry is None and language != self.default_language:
+            fallback_translations = self._compiled_translations.get(self.default_language.value, {})
+            entry = fallback_translations.get(key)
         
         # Final fallback to key itself
-        if text is None:
-            text = f"[Missing: {key}]"
-            
-        # Handle list formatting
-        if isinstance(text, list):
-            text = "\n".join(text)
+        if entry is None:
+            return f"[Missing: {key}]"
+        
+        text, format_map = entry
         
-        # Apply string formatting if kwargs provided
-        if kwargs:
+        # Only templates with placeholders carry a formatter
+        if params and format_map is not None:
             try:
-                text = text.format(**kwargs)
+                text = format_map(params)
             except (KeyError, ValueError) as e:
                 # If formatting fails, return unformatted text
                 pass
@@ -498,7 +577,8 @@ class LocalizationManager:
     
     def get_texts(self, keys: List[str], user_id: Optional[int] = None, **kwargs) -> List[str]:
         """Get multiple localized texts"""
-        return [self.get_text(key, user_id, **kwargs) for key in keys]
+        language = self._get_user_language(user_id)
+        return [self._format_text(key, language, kwargs) for key in keys]
     
     def set_user_language(self, user_id: int, language: SupportedLanguage, country_code: Optional[str] = None):
         """Set user language preference"""
@@ -508,18 +588,17 @@ class LocalizationManager:
             country_code=country_code
         )
         self.user_preferences[user_id] = preference
+        self._user_languages[user_id] = language
         self._save_user_preferences()
     
     def get_user_language(self, user_id: int) -> SupportedLanguage:
         """Get user's preferred language"""
-        preference = self.user_preferences.get(user_id)
-        return preference.language if preference else self.default_language
+        return self._user_languages.get(user_id, self.default_language)
     
     def _get_user_language(self, user_id: Optional[int]) -> SupportedLanguage:
         """Internal method to get user language with None handling"""
-        if user_id is None:
-            return self.default_language
-        return self.get_user_language(user_id)
+        # None is never a key, so a single lookup covers the anonymous case
+        return self._user_languages.get(user_id, self.default_language)
     
     def detect_language_from_locale(self, locale: str) -> SupportedLanguage:
         """
@@ -532,11 +611,7 @@ class LocalizationManager:
             Detected supported language
         """
         if locale:
-            lang_code = locale.lower().split('-')[0]
-            if lang_code == 'ru':
-                return SupportedLanguage.RUSSIAN
-            elif lang_code == 'en':
-                return SupportedLanguage.ENGLISH
+            return _LOCALE_LANGUAGES.get(locale.partition('-')[0].lower(), self.default_language)
         
         return self.default_language
     
@@ -557,25 +632,46 @@ class LocalizationManager:
                         language=language,
                         country_code=country_code
                     )
+                    self._user_languages[user_id] = language
         except (json.JSONDecodeError, KeyError, ValueError) as e:
             # If preferences file is corrupted, start fresh
             pass
     
     def _save_user_preferences(self):
-        """Save user language preferences to file"""
+        """
+        Save user language preferences to file
+        
+        The snapshot is taken on the calling thread. Inside a running event loop
+        the disk write is handed to a background writer so handlers never block
+        on file I/O; outside of one the write happens synchronously.
+        """
+        data = {
+            str(user_id): {
+                'language': preference.language.value,
+                'country_code': preference.country_code
+            }
+            for user_id, preference in self.user_preferences.items()
+        }
+        
         try:
-            data = {}
-            for user_id, preference in self.user_preferences.items():
-                data[str(user_id)] = {
-                    'language': preference.language.value,
-                    'country_code': preference.country_code
-                }
-            
-            with open(self.preferences_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            # Don't fail the application if preferences can't be saved
-            pass
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self._write_user_preferences(data)
+            return
+        
+        future = self._preferences_writer.submit(self._write_user_preferences, data)
+        future.add_done_callback(self._log_save_failure)
+    
+    def _write_user_preferences(self, data: Dict[str, Dict[str, Optional[str]]]):
+        """Write a preferences snapshot to disk"""
+        with open(self.preferences_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+    
+    def _log_save_failure(self, future: Future):
+        """Report background preference write errors instead of dropping them"""
+        error = future.exception()
+        if error is not None:
+            logger.error(f"Failed to save user language preferences: {error}")
     
     def get_supported_languages(self) -> List[SupportedLanguage]:
         """Get list of supported languages"""
@@ -583,21 +679,15 @@ class LocalizationManager:
     
     def format_stage_name(self, stage_key: str, user_id: Optional[int] = None) -> str:
         """Format stage name for display"""
-        return self.get_text(f"stage_{stage_key.lower()}", user_id)
+        name = self._stage_names[self._get_user_language(user_id)].get(stage_key)
+        if name is None:
+            return self.get_text(f"stage_{stage_key.lower()}", user_id)
+        return name
     
     def format_prompt_description(self, variant_name: str, user_id: Optional[int] = None) -> str:
         """Format prompt variant description"""
-        # Map variant names to translation keys
-        variant_mapping = {
-            "v1_master": "prompt_master",
-            "v2_telegram": "prompt_telegram", 
-            "v3_conversational": "prompt_conversational",
-            "v4_stage_specific": "prompt_stage_specific",
-            "v5_conversation_mgmt": "prompt_conversation_mgmt"
-        }
-        
-        key = variant_mapping.get(variant_name, "prompt_master")
-        return self.get_text(key, user_id)
+        descriptions = self._prompt_descriptions[self._get_user_language(user_id)]
+        return descriptions.get(variant_name, descriptions[_DEFAULT_PROMPT_VARIANT])
     
     def get_language_selection_keyboard(self) -> List[List[Dict[str, str]]]:
         """Get keyboard layout for language selection"""
@@ -617,67 +707,85 @@ class LocalizationManager:
 # Global localization manager instance
 localization = LocalizationManager()
 
+# Bound once so the shortcuts below skip the global + attribute lookup per call
+_format_text = localization._format_text
+_resolve_language = localization._get_user_language
+_set_user_language = localization.set_user_language
+_default_language = localization.default_language
+
+# Default-language texts for the common bare t(key) call shape
+_default_texts: Mapping[str, str] = MappingProxyType({
+    key: text
+    for key, (text, _) in localization._compiled_translations[localization.default_language.value].items()
+})
+
+
+@lru_cache(maxsize=4096)
+def _cached_text(key: str, language: SupportedLanguage, format_args: tuple) -> str:
+    """Memoized lookup + formatting; translations are static for the process"""
+    return _format_text(key, language, dict(format_args))
+
+
+@lru_cache(maxsize=1024)
+def _cached_texts(keys: Tuple[str, ...], language: SupportedLanguage) -> Tuple[str, ...]:
+    """Memoized unformatted batch lookup for repeated menu/panel renders"""
+    return tuple(_format_text(key, language, None) for key in keys)
+
+
+def _translate(key: str, language: SupportedLanguage, params: Optional[Mapping[str, Any]]) -> str:
+    """Cached translation for a resolved language"""
+    try:
+        return _cached_text(key, language, tuple(sorted(params.items())) if params else ())
+    except TypeError:
+        # Unhashable format arguments can't be used as a cache key
+        return _format_text(key, language, params)
+
 
 # Convenience functions for easy integration
 def t(key: str, user_id: Optional[int] = None, **kwargs) -> str:
     """Shortcut function for getting translated text"""
-    return localization.get_text(key, user_id, **kwargs)
+    if user_id is None and not kwargs:
+        text = _default_texts.get(key)
+        if text is not None:
+            return text
+    
+    return _translate(key, _resolve_language(user_id), kwargs)
+
+
+def t_map(key: str, params: Optional[Mapping[str, Any]] = None, user_id: Optional[int] = None) -> str:
+    """Shortcut function for translated text with a prebuilt format mapping"""
+    if user_id is None and not params:
+        text = _default_texts.get(key)
+        if text is not None:
+            return text
+    
+    return _translate(key, _resolve_language(user_id), params)
 
 
 def ts(keys: List[str], user_id: Optional[int] = None, **kwargs) -> List[str]:
     """Shortcut function for getting multiple translated texts"""
-    return localization.get_texts(keys, user_id, **kwargs)
+    if user_id is None and not kwargs:
+        return [_default_texts[key] if key in _default_texts else t(key) for key in keys]
+    
+    # Resolve the language and build the cache key suffix once for the batch
+    language = _resolve_language(user_id)
+    if not kwargs:
+        return list(_cached_texts(tuple(keys), language))
+    
+    format_args = tuple(sorted(kwargs.items()))
+    try:
+        return [_cached_text(key, language, format_args) for key in keys]
+    except TypeError:
+        return [_format_text(key, language, kwargs) for key in keys]
 
 
 def set_language(user_id: int, language: SupportedLanguage):
     """Shortcut function for setting user language"""
-    localization.set_user_language(user_id, language)
+    _set_user_language(user_id, language)
 
 
 def detect_language(locale: str) -> SupportedLanguage:
     """Shortcut function for language detection"""
-    return localization.detect_language_from_locale(locale)
-
-
-# Example usage and testing functions
-def demo_localization():
-    """Demonstrate localization functionality"""
-    print("=== Localization Demo ===\n")
-    
-    # Test user preferences
-    test_user_en = 12345
-    test_user_ru = 67890
-    
-    # Set languages
-    set_language(test_user_en, SupportedLanguage.ENGLISH)
-    set_language(test_user_ru, SupportedLanguage.RUSSIAN)
-    
-    # Test basic translations
-    print("English welcome:")
-    print(t("welcome_greeting", test_user_en, username="John"))
-    print()
-    
-    print("Russian welcome:")
-    print(t("welcome_greeting", test_user_ru, username="Иван"))
-    print()
-    
-    # Test stage names
-    print("Stage names comparison:")
-    stages = ["greeting", "profiling", "essence", "operations"]
-    for stage in stages:
-        en_name = localization.format_stage_name(stage, test_user_en)
-        ru_name = localization.format_stage_name(stage, test_user_ru)
-        print(f"  {stage}: EN='{en_name}' | RU='{ru_name}'")
-    print()
-    
-    # Test prompt descriptions
-    print("Prompt descriptions:")
-    variants = ["v1_master", "v2_telegram", "v3_conversational"]
-    for variant in variants:
-        en_desc = localization.format_prompt_description(variant, test_user_en)
-        ru_desc = localization.format_prompt_description(variant, test_user_ru)
-        print(f"  {variant}: EN='{en_desc}' | RU='{ru_desc}'")
-
-
-if __name__ == "__main__":
-    demo_localization()
\ No newline at end of file
+    if locale:
+        return _LOCALE_LANGUAGES.get(locale.partition('-')[0].lower(), _default_language)
+    return _default_language
@@ -6,8 +6,7 @@ import asyncio
 import os
 from pathlib import Path
 from dotenv import load_dotenv
-from mutagen import File as MutagenFile
-from src.handlers.voice_handler import AssemblyAIClient, VoiceProcessingConfig
+from src.handlers.voice_handler import AssemblyAIClient, VoiceProcessingConfig, ogg_duration
 
 # Load environment variables
 load_dotenv()
@@ -26,9 +25,9 @@ async def test_voice_transcription():
     print(f"🎤 Testing voice transcription with: {test_file}")
     print(f"📁 File size: {test_file.stat().st_size} bytes")
     
-    # Get audio duration using mutagen
-    audio_file = MutagenFile(test_file)
-    duration = audio_file.info.length if audio_file else 0
+    # Get audio duration from the Ogg headers, off the event loop
+    loop = asyncio.get_running_loop()
+    duration = await loop.run_in_executor(None, ogg_duration, test_file)
     print(f"⏱️  Audio duration: {duration}s")
     
     # Load configuration
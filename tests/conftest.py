@@ -6,6 +6,7 @@ all test modules in the project.
 """
 
 import asyncio
+import copy
 import os
 import tempfile
 import wave
@@ -16,29 +17,34 @@ from unittest.mock import Mock, AsyncMock, MagicMock
 import pytest
 import pytest_asyncio
 
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+from src.handlers.voice_handler import (
+    AudioProcessor,
+    VoiceProcessingConfig,
+    VoiceQuality,
+    VoiceTranscriptionResult
+)
+
 # Test constants
 TEST_API_KEY = "test_api_key_12345"
 TEST_AUDIO_DURATION = 5.0
 TEST_AUDIO_SIZE = 1024 * 100  # 100KB
 INTEGRATION_TEST_ENABLED = os.getenv('ASSEMBLYAI_INTEGRATION_TESTS', 'false').lower() == 'true'
 
-# Configure asyncio for tests
-@pytest.fixture(scope="session")
-def event_loop():
-    """Create an instance of the default event loop for the test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
-
 # =============================================================================
 # CONFIGURATION FIXTURES
 # =============================================================================
 
-@pytest.fixture
-def test_config():
+# Configs are built once per session; tests get their own copy to mutate
+
+@pytest.fixture(scope="session")
+def _test_config_template():
     """Create comprehensive test configuration with all features enabled"""
-    from src.handlers.voice_handler import VoiceProcessingConfig
-    
     return VoiceProcessingConfig(
         assemblyai_api_key=TEST_API_KEY,
         max_file_size_mb=25,
@@ -69,10 +75,13 @@ def test_config():
     )
 
 @pytest.fixture
-def minimal_config():
+def test_config(_test_config_template):
+    """Comprehensive test configuration with all features enabled"""
+    return copy.deepcopy(_test_config_template)
+
+@pytest.fixture(scope="session")
+def _minimal_config_template():
     """Create minimal test configuration with basic features only"""
-    from src.handlers.voice_handler import VoiceProcessingConfig
-    
     return VoiceProcessingConfig(
         assemblyai_api_key=TEST_API_KEY,
         enable_auto_language_detection=False,
@@ -84,11 +93,14 @@ def minimal_config():
         enable_sentiment_analysis=False
     )
 
+@pytest.fixture
+def minimal_config(_minimal_config_template):
+    """Minimal test configuration with basic features only"""
+    return copy.deepcopy(_minimal_config_template)
+
 @pytest.fixture
 def real_config():
     """Create configuration for real API testing (if enabled)"""
-    from src.handlers.voice_handler import VoiceProcessingConfig
-    
     real_api_key = os.getenv('ASSEMBLYAI_API_KEY')
     if not real_api_key:
         pytest.skip("ASSEMBLYAI_API_KEY not set for real API tests")
@@ -165,30 +177,30 @@ def mock_telegram_context(mock_telegram_file):
 # AUDIO FILE FIXTURES
 # =============================================================================
 
+def _write_sparse_audio(path: Path, header: bytes, size: int) -> Path:
+    """Write `header` and extend the file to `size` bytes without writing the zeros"""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT, 0o600)
+    try:
+        os.write(fd, header)
+        os.ftruncate(fd, size)
+    finally:
+        os.close(fd)
+    return path
+
 @pytest.fixture
-def sample_ogg_file():
+def sample_ogg_file(tmp_path):
     """Create a temporary OGG audio file for testing"""
-    temp_file = tempfile.NamedTemporaryFile(suffix=".ogg", delete=False)
     # Create minimal OGG file header + some data
     ogg_header = b'OggS\x00\x02\x00\x00\x00\x00\x00\x00\x00\x00'
-    temp_file.write(ogg_header + b'\x00' * (TEST_AUDIO_SIZE - len(ogg_header)))
-    temp_file.close()
-    
-    yield Path(temp_file.name)
-    
-    # Cleanup
-    try:
-        Path(temp_file.name).unlink()
-    except FileNotFoundError:
-        pass
+    return _write_sparse_audio(tmp_path / "sample.ogg", ogg_header, TEST_AUDIO_SIZE)
 
 @pytest.fixture
-def sample_wav_file():
+def sample_wav_file(tmp_path):
     """Create a temporary WAV audio file for testing"""
-    temp_file = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
+    wav_path = tmp_path / "sample.wav"
     
     # Create a proper WAV file with 1 second of silence
-    with wave.open(temp_file.name, 'wb') as wav_file:
+    with wave.open(str(wav_path), 'wb') as wav_file:
         wav_file.setnchannels(1)  # Mono
         wav_file.setsampwidth(2)  # 16-bit
         wav_file.setframerate(16000)  # 16kHz
@@ -196,67 +208,29 @@ def sample_wav_file():
         silence = b'\x00\x00' * 16000
         wav_file.writeframes(silence)
     
-    yield Path(temp_file.name)
-    
-    # Cleanup
-    try:
-        Path(temp_file.name).unlink()
-    except FileNotFoundError:
-        pass
+    return wav_path
 
 @pytest.fixture
-def sample_mp3_file():
+def sample_mp3_file(tmp_path):
     """Create a temporary MP3-like file for testing"""
-    temp_file = tempfile.NamedTemporaryFile(suffix=".mp3", delete=False)
     # Create minimal MP3 header
     mp3_header = b'\xFF\xFB\x90\x00'  # MP3 frame header
-    temp_file.write(mp3_header + b'\x00' * (TEST_AUDIO_SIZE - len(mp3_header)))
-    temp_file.close()
-    
-    yield Path(temp_file.name)
-    
-    # Cleanup
-    try:
-        Path(temp_file.name).unlink()
-    except FileNotFoundError:
-        pass
+    return _write_sparse_audio(tmp_path / "sample.mp3", mp3_header, TEST_AUDIO_SIZE)
 
 @pytest.fixture
-def large_audio_file():
+def large_audio_file(tmp_path):
     """Create a large audio file for testing file size limits"""
-    temp_file = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
-    
-    # Create 30MB file (over the 25MB limit)
+    # Create 30MB file (over the 25MB limit); sparse, so only the header is written
     large_size = 30 * 1024 * 1024
-    with open(temp_file.name, 'wb') as f:
-        # Write WAV header
-        f.write(b'RIFF\x00\x00\x00\x00WAVE')
-        # Fill with zeros
-        f.write(b'\x00' * (large_size - 12))
-    
-    yield Path(temp_file.name)
-    
-    # Cleanup
-    try:
-        Path(temp_file.name).unlink()
-    except FileNotFoundError:
-        pass
+    return _write_sparse_audio(tmp_path / "large.wav", b'RIFF\x00\x00\x00\x00WAVE', large_size)
 
 @pytest.fixture
-def corrupted_audio_file():
+def corrupted_audio_file(tmp_path):
     """Create a corrupted audio file for testing error handling"""
-    temp_file = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
+    corrupted_path = tmp_path / "corrupted.wav"
     # Write invalid audio data
-    temp_file.write(b'This is not valid audio data at all!')
-    temp_file.close()
-    
-    yield Path(temp_file.name)
-    
-    # Cleanup
-    try:
-        Path(temp_file.name).unlink()
-    except FileNotFoundError:
-        pass
+    corrupted_path.write_bytes(b'This is not valid audio data at all!')
+    return corrupted_path
 
 # =============================================================================
 # METADATA FIXTURES
@@ -298,7 +272,9 @@ def large_file_metadata():
 # MOCK ASSEMBLYAI FIXTURES
 # =============================================================================
 
-@pytest.fixture
+# Transcript mocks are built once per session and shared; treat them as read-only
+
+@pytest.fixture(scope="session")
 def mock_successful_transcript():
     """Create mock successful AssemblyAI transcript"""
     transcript = Mock()
@@ -366,7 +342,7 @@ def mock_successful_transcript():
     
     return transcript
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_failed_transcript():
     """Create mock failed AssemblyAI transcript"""
     transcript = Mock()
@@ -389,7 +365,7 @@ def mock_failed_transcript():
     
     return transcript
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_low_confidence_transcript():
     """Create mock transcript with low confidence"""
     transcript = Mock()
@@ -412,7 +388,7 @@ def mock_low_confidence_transcript():
     
     return transcript
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_processing_transcript():
     """Create mock transcript in processing state"""
     transcript = Mock()
@@ -443,8 +419,6 @@ def temp_audio_dir():
 @pytest.fixture
 def mock_audio_processor_temp_dir(temp_audio_dir):
     """Create audio processor with custom temp directory for testing"""
-    from voice_handler import AudioProcessor
-    
     processor = AudioProcessor()
     processor.temp_dir = temp_audio_dir
     return processor
@@ -453,11 +427,9 @@ def mock_audio_processor_temp_dir(temp_audio_dir):
 # PERFORMANCE TEST FIXTURES
 # =============================================================================
 
-@pytest.fixture
-def performance_config():
+@pytest.fixture(scope="session")
+def _performance_config_template():
     """Create configuration optimized for performance testing"""
-    from src.handlers.voice_handler import VoiceProcessingConfig
-    
     return VoiceProcessingConfig(
         assemblyai_api_key=TEST_API_KEY,
         concurrent_requests=5,  # Higher concurrency
@@ -472,6 +444,11 @@ def performance_config():
         enable_sentiment_analysis=False
     )
 
+@pytest.fixture
+def performance_config(_performance_config_template):
+    """Configuration optimized for performance testing"""
+    return copy.deepcopy(_performance_config_template)
+
 # =============================================================================
 # MOCK ASSEMBLYAI SDK
 # =============================================================================
@@ -510,8 +487,6 @@ def mock_assemblyai_sdk():
 @pytest.fixture
 def successful_transcription_result():
     """Create successful transcription result"""
-    from voice_handler import VoiceTranscriptionResult, VoiceQuality
-    
     return VoiceTranscriptionResult(
         text="This is a successful test transcription with high quality",
         confidence=0.95,
@@ -533,8 +508,6 @@ def successful_transcription_result():
 @pytest.fixture
 def failed_transcription_result():
     """Create failed transcription result"""
-    from voice_handler import VoiceTranscriptionResult, VoiceQuality
-    
     return VoiceTranscriptionResult(
         text="",
         confidence=0.0,
@@ -597,20 +570,26 @@ def pytest_configure(config):
     config.addinivalue_line("markers", "performance: marks tests as performance tests") 
     config.addinivalue_line("markers", "real_api: marks tests that use real AssemblyAI API")
     config.addinivalue_line("markers", "slow: marks tests as slow running")
+    
+    # pytest-asyncio creates each test's loop from the current policy
+    if UVLOOP_AVAILABLE:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
 
 def pytest_collection_modifyitems(config, items):
     """Modify test collection based on environment and markers"""
     # Skip real API tests if integration testing is not enabled
+    skip_real_api = None
     if not INTEGRATION_TEST_ENABLED:
         skip_real_api = pytest.mark.skip(reason="Real API tests disabled (set ASSEMBLYAI_INTEGRATION_TESTS=true to enable)")
-        for item in items:
-            if "real_api" in item.keywords:
-                item.add_marker(skip_real_api)
+    slow_mark = pytest.mark.slow
     
-    # Mark slow tests
+    # One pass: skip real API tests and mark slow tests
     for item in items:
-        if "performance" in item.keywords or "integration" in item.keywords:
-            item.add_marker(pytest.mark.slow)
+        keywords = item.keywords
+        if skip_real_api is not None and "real_api" in keywords:
+            item.add_marker(skip_real_api)
+        if "performance" in keywords or "integration" in keywords:
+            item.add_marker(slow_mark)
 
 # =============================================================================
 # CUSTOM ASSERTIONS
@@ -618,8 +597,6 @@ def pytest_collection_modifyitems(config, items):
 
 def assert_transcription_result_valid(result):
     """Assert that a transcription result is valid"""
-    from voice_handler import VoiceTranscriptionResult, VoiceQuality
-    
     assert isinstance(result, VoiceTranscriptionResult)
     assert isinstance(result.text, str)
     assert isinstance(result.confidence, float)
@@ -632,8 +609,6 @@ def assert_transcription_result_valid(result):
 
 def assert_config_valid(config):
     """Assert that a voice processing config is valid"""
-    from src.handlers.voice_handler import VoiceProcessingConfig
-    
     assert isinstance(config, VoiceProcessingConfig)
     assert config.assemblyai_api_key
     assert config.max_file_size_mb > 0
@@ -642,7 +617,3 @@ def assert_config_valid(config):
     assert 0.0 <= config.confidence_threshold <= 1.0
     assert config.concurrent_requests > 0
     assert config.retry_attempts >= 0
-
-# Export custom assertions for use in tests
-pytest.assert_transcription_result_valid = assert_transcription_result_valid
-pytest.assert_config_valid = assert_config_valid
\ No newline at end of file
@@ -24,44 +24,35 @@ Usage:
 """
 
 import asyncio
+import copy
 import json
 import os
+import shutil
 import tempfile
 import time
 import hashlib
+import importlib.util
+import struct
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 from unittest.mock import Mock, MagicMock, AsyncMock, patch, mock_open
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from types import SimpleNamespace
 from io import BytesIO
 
 import pytest
 import pytest_asyncio
+import httpx
 from unittest import IsolatedAsyncioTestCase
 
-# Import the modules to test
-from src.handlers.voice_handler import (
-    VoiceMessageHandler,
-    VoiceTranscriptionResult,
-    VoiceProcessingConfig,
-    VoiceQuality,
-    AudioFormat,
-    AudioProcessor,
-    AssemblyAIClient,
-    create_voice_handler,
-    create_voice_handler_with_features
-)
-from src.core.config import BotConfig
+# Mock AssemblyAI to avoid import issues in testing environment.
+# Only checked for, not imported, here; the mock is built only when it is missing.
+ASSEMBLYAI_AVAILABLE = importlib.util.find_spec("assemblyai") is not None
 
-# Mock AssemblyAI to avoid import issues in testing environment
-try:
-    import assemblyai as aai
-    ASSEMBLYAI_AVAILABLE = True
-except ImportError:
-    # Create mock assemblyai module for testing
+def _install_assemblyai_mock():
+    """Register a stand-in assemblyai module so voice_handler can import"""
     import sys
-    from unittest.mock import MagicMock
     
     mock_aai = MagicMock()
     mock_aai.settings = MagicMock()
@@ -72,8 +63,29 @@ except ImportError:
     mock_aai.PIISubstitutionPolicy = MagicMock()
     
     sys.modules['assemblyai'] = mock_aai
-    import assemblyai as aai
-    ASSEMBLYAI_AVAILABLE = False
+
+if not ASSEMBLYAI_AVAILABLE:
+    _install_assemblyai_mock()
+
+# Import the modules to test
+from src.handlers.voice_handler import (
+    VoiceMessageHandler,
+    VoiceTranscriptionResult,
+    VoiceProcessingConfig,
+    VoiceQuality,
+    AudioFormat,
+    AudioProcessor,
+    AssemblyAIClient,
+    RetryableError,
+    NonRetryableError,
+    create_voice_handler,
+    create_voice_handler_with_features,
+    ogg_duration,
+    SCIPY_AVAILABLE,
+    SOXR_AVAILABLE,
+    AIOHTTP_AVAILABLE
+)
+from src.core.config import BotConfig
 
 # Test configuration
 TEST_AUDIO_DURATION = 5.0  # seconds
@@ -81,9 +93,14 @@ TEST_AUDIO_SIZE = 1024 * 100  # 100KB
 TEST_API_KEY = "test_api_key_12345"
 INTEGRATION_TEST_ENABLED = os.getenv('ASSEMBLYAI_INTEGRATION_TESTS', 'false').lower() == 'true'
 
+# Dummy audio data (OGG header-like bytes) for sample_audio_file
+_OGG_TEST_PAYLOAD = b'OggS\x00\x02\x00\x00\x00\x00\x00\x00\x00\x00' + b'\x00' * (TEST_AUDIO_SIZE - 10)
+
 # Test fixtures and data
-@pytest.fixture
-def test_config():
+
+# Configs are built once per session; each test gets its own copy
+@pytest.fixture(scope="session")
+def _test_config_template():
     """Create test configuration"""
     return VoiceProcessingConfig(
         assemblyai_api_key=TEST_API_KEY,
@@ -108,7 +125,12 @@ def test_config():
     )
 
 @pytest.fixture
-def minimal_config():
+def test_config(_test_config_template):
+    """Test configuration"""
+    return copy.deepcopy(_test_config_template)
+
+@pytest.fixture(scope="session")
+def _minimal_config_template():
     """Create minimal test configuration"""
     return VoiceProcessingConfig(
         assemblyai_api_key=TEST_API_KEY,
@@ -121,41 +143,69 @@ def minimal_config():
         enable_sentiment_analysis=False
     )
 
+@pytest.fixture
+def minimal_config(_minimal_config_template):
+    """Minimal test configuration"""
+    return copy.deepcopy(_minimal_config_template)
+
+# Plain value objects stand in for Telegram types; only awaited methods are mocks
+
+@dataclass(frozen=True, slots=True)
+class _FakeVoice:
+    duration: float
+    file_size: int
+    mime_type: str
+    file_id: str
+
+@dataclass(slots=True)
+class _FakeTelegramFile:
+    file_id: str
+    mime_type: str
+    download_to_drive: AsyncMock = field(default_factory=AsyncMock)
+
+@dataclass(frozen=True, slots=True)
+class _FakeUpdate:
+    effective_user: SimpleNamespace
+    effective_chat: SimpleNamespace
+    message: SimpleNamespace
+
+@dataclass(frozen=True, slots=True)
+class _FakeBot:
+    get_file: AsyncMock = field(default_factory=AsyncMock)
+    send_chat_action: AsyncMock = field(default_factory=AsyncMock)
+
+@dataclass(frozen=True, slots=True)
+class _FakeContext:
+    bot: _FakeBot = field(default_factory=_FakeBot)
+
 @pytest.fixture
 def mock_telegram_voice():
     """Create mock Telegram voice message"""
-    voice = Mock()
-    voice.duration = TEST_AUDIO_DURATION
-    voice.file_size = TEST_AUDIO_SIZE
-    voice.mime_type = "audio/ogg"
-    voice.file_id = "test_file_id_123"
-    return voice
+    return _FakeVoice(
+        duration=TEST_AUDIO_DURATION,
+        file_size=TEST_AUDIO_SIZE,
+        mime_type="audio/ogg",
+        file_id="test_file_id_123"
+    )
 
 @pytest.fixture
 def mock_telegram_file():
     """Create mock Telegram file object"""
-    file = Mock()
-    file.file_id = "test_file_id_123"
-    file.mime_type = "audio/ogg"
-    file.download_to_drive = AsyncMock()
-    return file
+    return _FakeTelegramFile(file_id="test_file_id_123", mime_type="audio/ogg")
 
 @pytest.fixture
-def mock_telegram_update():
+def mock_telegram_update(mock_telegram_voice):
     """Create mock Telegram update with voice message"""
-    update = Mock()
-    update.effective_user.id = 12345
-    update.effective_chat.id = 67890
-    update.message.voice = mock_telegram_voice()
-    return update
+    return _FakeUpdate(
+        effective_user=SimpleNamespace(id=12345),
+        effective_chat=SimpleNamespace(id=67890),
+        message=SimpleNamespace(voice=mock_telegram_voice)
+    )
 
 @pytest.fixture
 def mock_telegram_context():
     """Create mock Telegram context"""
-    context = Mock()
-    context.bot.get_file = AsyncMock()
-    context.bot.send_chat_action = AsyncMock()
-    return context
+    return _FakeContext()
 
 @pytest.fixture
 def test_audio_metadata():
@@ -171,76 +221,89 @@ def test_audio_metadata():
         "telegram_mime_type": "audio/ogg"
     }
 
-@pytest.fixture
+@dataclass(frozen=True, slots=True)
+class _FakeTranscript:
+    """Stand-in for aai.Transcript with the attributes voice_handler reads"""
+    id: str
+    status: str
+    text: Optional[str] = None
+    confidence: Optional[float] = None
+    language_code: Optional[str] = None
+    audio_url: Optional[str] = None
+    error: Optional[str] = None
+    summary: Optional[str] = None
+    language_detection_results: List[Any] = field(default_factory=list)
+    utterances: List[Any] = field(default_factory=list)
+    chapters: List[Any] = field(default_factory=list)
+    content_safety_labels: Optional[Any] = None
+    topics: List[Any] = field(default_factory=list)
+    sentiment_analysis_results: List[Any] = field(default_factory=list)
+
+# Transcripts are frozen, so one instance per session is shared safely
+@pytest.fixture(scope="session")
 def mock_successful_transcript():
     """Create mock successful AssemblyAI transcript"""
-    transcript = Mock()
-    transcript.id = "transcript_123"
-    transcript.status = "completed"
-    transcript.text = "Hello, this is a test transcription"
-    transcript.confidence = 0.95
-    transcript.language_code = "en"
-    transcript.audio_url = "https://api.assemblyai.com/v2/transcript/transcript_123/audio"
-    
-    # Enhanced features
-    transcript.summary = "This is a test summary"
-    transcript.language_detection_results = [
-        Mock(language="en", confidence=0.98)
-    ]
-    transcript.utterances = [
-        Mock(speaker="A", text="Hello, this is a test", confidence=0.95, start=0, end=2000)
-    ]
-    transcript.chapters = [
-        Mock(summary="Test chapter", headline="Introduction", start=0, end=5000)
-    ]
-    transcript.content_safety_labels = Mock(
-        results=[Mock(label="safe", confidence=0.99, severity=0.1)]
+    return _FakeTranscript(
+        id="transcript_123",
+        status="completed",
+        text="Hello, this is a test transcription",
+        confidence=0.95,
+        language_code="en",
+        audio_url="https://api.assemblyai.com/v2/transcript/transcript_123/audio",
+        
+        # Enhanced features
+        summary="This is a test summary",
+        language_detection_results=[
+            SimpleNamespace(language="en", confidence=0.98)
+        ],
+        utterances=[
+            SimpleNamespace(speaker="A", text="Hello, this is a test", confidence=0.95, start=0, end=2000)
+        ],
+        chapters=[
+            SimpleNamespace(summary="Test chapter", headline="Introduction", start=0, end=5000)
+        ],
+        content_safety_labels=SimpleNamespace(
+            results=[SimpleNamespace(label="safe", confidence=0.99, severity=0.1)]
+        ),
+        topics=[
+            SimpleNamespace(text="testing", labels=[SimpleNamespace(relevance=0.8, label="technology")])
+        ],
+        sentiment_analysis_results=[
+            SimpleNamespace(text="Hello, this is a test", sentiment="POSITIVE", confidence=0.8, start=0, end=2000)
+        ]
     )
-    transcript.topics = [
-        Mock(text="testing", labels=[Mock(relevance=0.8, label="technology")])
-    ]
-    transcript.sentiment_analysis_results = [
-        Mock(text="Hello, this is a test", sentiment="POSITIVE", confidence=0.8, start=0, end=2000)
-    ]
-    
-    return transcript
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_failed_transcript():
     """Create mock failed AssemblyAI transcript"""
-    transcript = Mock()
-    transcript.id = "transcript_failed_123"
-    transcript.status = "error"
-    transcript.error = "Audio file could not be processed"
-    transcript.text = None
-    transcript.confidence = None
-    return transcript
+    return _FakeTranscript(
+        id="transcript_failed_123",
+        status="error",
+        error="Audio file could not be processed"
+    )
+
+@pytest.fixture(scope="session")
+def _sample_audio_template(tmp_path_factory):
+    """Write the sample audio bytes once per session (per xdist worker)"""
+    template = tmp_path_factory.mktemp("audio_template") / "sample.ogg"
+    template.write_bytes(_OGG_TEST_PAYLOAD)
+    return template
 
 @pytest.fixture
-def sample_audio_file():
+def sample_audio_file(_sample_audio_template, tmp_path):
     """Create a temporary sample audio file for testing"""
-    # Create a temporary file with some audio-like content
-    temp_file = tempfile.NamedTemporaryFile(suffix=".ogg", delete=False)
-    # Write some dummy audio data (OGG header-like bytes)
-    temp_file.write(b'OggS\x00\x02\x00\x00\x00\x00\x00\x00\x00\x00' + b'\x00' * (TEST_AUDIO_SIZE - 10))
-    temp_file.close()
-    
-    yield Path(temp_file.name)
-    
-    # Cleanup
-    try:
-        Path(temp_file.name).unlink()
-    except FileNotFoundError:
-        pass
+    # Each test gets its own copy, so tests may modify or delete it
+    audio_file = tmp_path / "sample.ogg"
+    shutil.copyfile(_sample_audio_template, audio_file)
+    return audio_file
 
 @pytest.fixture
-def temporary_directory():
+def temporary_directory(tmp_path_factory):
     """Create temporary directory for testing"""
-    temp_dir = tempfile.mkdtemp()
-    yield Path(temp_dir)
+    temp_dir = tmp_path_factory.mktemp("voice", numbered=True)
+    yield temp_dir
     
     # Cleanup
-    import shutil
     try:
         shutil.rmtree(temp_dir)
     except FileNotFoundError:
@@ -251,6 +314,7 @@ def temporary_directory():
 # UNIT TESTS - Configuration Validation
 # =============================================================================
 
+@pytest.mark.xdist_group("voice_config")
 class TestVoiceProcessingConfig:
     """Test configuration validation and initialization"""
     
@@ -375,6 +439,36 @@ class TestAudioProcessor:
         assert "voice_12345_" in result_path.name
         assert result_path.stat().st_size > 0
     
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(not AIOHTTP_AVAILABLE, reason="aiohttp not installed")
+    async def test_download_voice_message_streamed(self):
+        """Test that files with a download URL are streamed to disk in chunks"""
+        chunks = [b'dummy audio data' * 100, b'more audio data' * 100]
+        
+        async def iter_chunked(size):
+            for chunk in chunks:
+                yield chunk
+        
+        response = MagicMock()
+        response.content.iter_chunked = iter_chunked
+        response.__aenter__ = AsyncMock(return_value=response)
+        response.__aexit__ = AsyncMock(return_value=False)
+        
+        self.processor._http = Mock(closed=False)
+        self.processor._http.get.return_value = response
+        
+        file = SimpleNamespace(
+            file_id="file_123",
+            file_path="https://api.telegram.org/file/bottoken/voice/file_123.oga",
+            download_to_drive=AsyncMock()
+        )
+        
+        result_path = await self.processor.download_voice_message(file, 12345)
+        
+        assert result_path.read_bytes() == b''.join(chunks)
+        self.processor._http.get.assert_called_once_with(file.file_path)
+        file.download_to_drive.assert_not_called()
+    
     @pytest.mark.asyncio
     async def test_download_voice_message_error(self, mock_telegram_file):
         """Test voice message download error handling"""
@@ -385,7 +479,10 @@ class TestAudioProcessor:
             await self.processor.download_voice_message(mock_telegram_file, 12345)
     
     @pytest.mark.asyncio
-    @patch('voice_handler.AudioSegment')
+    @patch('src.handlers.voice_handler.SOXR_AVAILABLE', False)
+    @patch('src.handlers.voice_handler.SCIPY_AVAILABLE', False)
+    @patch('src.handlers.voice_handler.FFMPEG_PATH', None)
+    @patch('src.handlers.voice_handler.pydub.AudioSegment')
     async def test_convert_and_optimize_success(self, mock_audio_segment, sample_audio_file):
         """Test audio conversion and optimization"""
         # Mock AudioSegment behavior
@@ -397,7 +494,7 @@ class TestAudioProcessor:
         mock_audio.set_frame_rate.return_value = mock_audio
         mock_audio.normalize.return_value = mock_audio
         mock_audio.high_pass_filter.return_value = mock_audio
-        mock_audio.export = Mock()
+        mock_audio.export = Mock(side_effect=lambda path, **kwargs: Path(path).write_bytes(b"RIFF" + b"\x00" * 1000))
         
         mock_audio_segment.from_file.return_value = mock_audio
         
@@ -417,7 +514,8 @@ class TestAudioProcessor:
         mock_audio.high_pass_filter.assert_called_with(100)
     
     @pytest.mark.asyncio
-    @patch('voice_handler.AudioSegment')
+    @patch('src.handlers.voice_handler.FFMPEG_PATH', None)
+    @patch('src.handlers.voice_handler.pydub.AudioSegment')
     async def test_convert_and_optimize_decode_error(self, mock_audio_segment, sample_audio_file):
         """Test audio conversion with decode error"""
         from pydub.exceptions import CouldntDecodeError
@@ -428,7 +526,88 @@ class TestAudioProcessor:
             await self.processor.convert_and_optimize(sample_audio_file)
     
     @pytest.mark.asyncio
-    @patch('voice_handler.AudioSegment')
+    @patch('src.handlers.voice_handler.FFPROBE_PATH', 'ffprobe')
+    @patch('src.handlers.voice_handler.FFMPEG_PATH', 'ffmpeg')
+    async def test_convert_and_optimize_ffmpeg(self, sample_audio_file):
+        """Test conversion through FFmpeg subprocesses"""
+        probe_output = json.dumps({
+            "streams": [{"channels": 2, "sample_rate": "48000"}],
+            "format": {"duration": "5.0"}
+        }).encode()
+        
+        def make_process(*args, **kwargs):
+            process = Mock(returncode=0)
+            if args[0] == 'ffprobe':
+                process.communicate = AsyncMock(return_value=(probe_output, b""))
+            elif args[-1] == '-':
+                # volumedetect pass
+                process.communicate = AsyncMock(return_value=(b"", b"[Parsed_volumedetect_1] max_volume: -6.0 dB\n"))
+            else:
+                Path(args[-1]).write_bytes(b"RIFF" + b"\x00" * 1000)
+                process.communicate = AsyncMock(return_value=(b"", b""))
+            return process
+        
+        with patch('asyncio.create_subprocess_exec', AsyncMock(side_effect=make_process)) as mock_exec:
+            result_path, metadata = await self.processor.convert_and_optimize(sample_audio_file)
+        
+        assert result_path.suffix == ".wav"
+        assert metadata["duration"] == 5.0
+        assert metadata["channels"] == 1
+        assert metadata["frame_rate"] == 16000
+        assert "processing_time" in metadata
+        
+        ffmpeg_args = mock_exec.call_args_list[2].args
+        assert ffmpeg_args[ffmpeg_args.index("-ac") + 1] == "1"
+        assert ffmpeg_args[ffmpeg_args.index("-ar") + 1] == "16000"
+        # Peak at -6.0 dBFS is raised to -0.1 dBFS after the high-pass
+        assert ffmpeg_args[ffmpeg_args.index("-af") + 1] == "highpass=f=100,volume=5.9dB"
+    
+    @pytest.mark.asyncio
+    @patch('src.handlers.voice_handler.FFPROBE_PATH', 'ffprobe')
+    @patch('src.handlers.voice_handler.FFMPEG_PATH', 'ffmpeg')
+    async def test_convert_and_optimize_ffmpeg_removes_partial_output(self, sample_audio_file):
+        """Test that a failed FFmpeg conversion does not leave its output behind"""
+        probe_output = json.dumps({
+            "streams": [{"channels": 1, "sample_rate": "16000"}],
+            "format": {"duration": "5.0"}
+        }).encode()
+        
+        def make_process(*args, **kwargs):
+            if args[0] == 'ffprobe':
+                process = Mock(returncode=0)
+                process.communicate = AsyncMock(return_value=(probe_output, b""))
+            elif args[-1] == '-':
+                process = Mock(returncode=0)
+                process.communicate = AsyncMock(return_value=(b"", b"max_volume: -1.0 dB"))
+            else:
+                # Conversion dies after writing part of the file
+                Path(args[-1]).write_bytes(b"RIFF")
+                process = Mock(returncode=1)
+                process.communicate = AsyncMock(return_value=(b"", b"Error while decoding stream"))
+            return process
+        
+        with patch('asyncio.create_subprocess_exec', AsyncMock(side_effect=make_process)):
+            with pytest.raises(ValueError, match="Unsupported audio format"):
+                await self.processor.convert_and_optimize(sample_audio_file)
+        
+        assert not sample_audio_file.with_suffix('.wav').exists()
+    
+    @pytest.mark.asyncio
+    @patch('src.handlers.voice_handler.FFPROBE_PATH', 'ffprobe')
+    @patch('src.handlers.voice_handler.FFMPEG_PATH', 'ffmpeg')
+    async def test_convert_and_optimize_ffmpeg_decode_error(self, sample_audio_file):
+        """Test FFmpeg conversion of a file it cannot decode"""
+        process = Mock(returncode=1)
+        process.communicate = AsyncMock(return_value=(b"", b"Invalid data found when processing input"))
+        
+        with patch('asyncio.create_subprocess_exec', AsyncMock(return_value=process)):
+            with pytest.raises(ValueError, match="Unsupported audio format"):
+                await self.processor.convert_and_optimize(sample_audio_file)
+    
+    @pytest.mark.asyncio
+    @patch('src.handlers.voice_handler.SOXR_AVAILABLE', False)
+    @patch('src.handlers.voice_handler.SCIPY_AVAILABLE', False)
+    @patch('src.handlers.voice_handler.pydub.AudioSegment')
     async def test_optimize_audio_mono_conversion(self, mock_audio_segment):
         """Test audio optimization for mono conversion"""
         # Create mock stereo audio
@@ -451,6 +630,37 @@ class TestAudioProcessor:
         mock_audio.normalize.assert_called_once()
         mock_audio.high_pass_filter.assert_called_with(100)
     
+    @pytest.mark.skipif(not SCIPY_AVAILABLE, reason="scipy not installed")
+    def test_filter_and_normalize_samples(self):
+        """Test the SciPy high-pass and peak normalization"""
+        import numpy as np
+        from pydub import AudioSegment
+        
+        t = np.arange(16000) / 16000
+        tone = (1000 * np.sin(2 * np.pi * 440 * t) + 4000).astype(np.int16)  # quiet tone plus DC offset
+        audio = AudioSegment(data=tone.tobytes(), sample_width=2, frame_rate=16000, channels=1)
+        
+        result = self.processor._filter_and_normalize_samples(audio)
+        samples = np.asarray(result.get_array_of_samples())
+        
+        assert result.frame_rate == 16000
+        assert len(samples) == len(tone)
+        assert abs(samples.mean()) < 50  # DC removed by the high-pass
+        assert np.abs(samples).max() > 30000  # Peak normalized
+    
+    @pytest.mark.skipif(not SOXR_AVAILABLE, reason="soxr not installed")
+    def test_resample_with_soxr(self):
+        """Test resampling to 16kHz with soxr"""
+        from pydub import AudioSegment
+        
+        audio = AudioSegment(data=b"\x00\x10" * 44100, sample_width=2, frame_rate=44100, channels=1)
+        
+        result = self.processor._resample(audio, 16000)
+        
+        assert result.frame_rate == 16000
+        assert result.sample_width == 2
+        assert abs(len(result.get_array_of_samples()) - 16000) <= 1
+    
     def test_cleanup_temp_files(self, temporary_directory):
         """Test temporary file cleanup"""
         # Create some test files with different ages
@@ -483,6 +693,27 @@ class TestAudioProcessor:
         assert not old_file.exists()  # Should be deleted
         assert recent_file.exists()   # Should remain
         assert other_file.exists()    # Should remain (not voice file)
+    
+    def test_ogg_duration_from_last_page(self, temporary_directory):
+        """Test Ogg Opus duration is read from the headers without decoding"""
+        def ogg_page(granule: int, packet: bytes) -> bytes:
+            header = b'OggS' + struct.pack('<BBqIII', 0, 0, granule, 1, 0, 0)
+            return header + bytes([1, len(packet)]) + packet
+        
+        opus_head = b'OpusHead' + struct.pack('<BBHIhB', 1, 1, 312, 48000, 0, 0)
+        ogg_file = temporary_directory / "voice_sample.ogg"
+        ogg_file.write_bytes(
+            ogg_page(0, opus_head) + ogg_page(0, b'\0' * 200) + ogg_page(312 + 48000 * 3, b'\0' * 200)
+        )
+        
+        assert ogg_duration(ogg_file) == pytest.approx(3.0)
+    
+    def test_ogg_duration_non_ogg_file(self, temporary_directory):
+        """Test non-Ogg files report zero duration"""
+        other_file = temporary_directory / "voice_sample.mp3"
+        other_file.write_bytes(b'ID3' + b'\0' * 100)
+        
+        assert ogg_duration(other_file) == 0.0
 
 
 # =============================================================================
@@ -498,7 +729,7 @@ class TestAssemblyAIClient:
         self.config = test_config
         
         # Mock the AssemblyAI SDK
-        with patch('voice_handler.aai') as mock_aai:
+        with patch('src.handlers.voice_handler.aai') as mock_aai:
             mock_aai.settings = Mock()
             mock_aai.Transcriber = Mock()
             mock_aai.TranscriptionConfig = Mock()
@@ -510,7 +741,7 @@ class TestAssemblyAIClient:
     
     def test_client_initialization(self):
         """Test AssemblyAI client initialization"""
-        with patch('voice_handler.aai') as mock_aai:
+        with patch('src.handlers.voice_handler.aai') as mock_aai:
             mock_aai.settings = Mock()
             mock_transcriber = Mock()
             mock_aai.Transcriber.return_value = mock_transcriber
@@ -545,6 +776,43 @@ class TestAssemblyAIClient:
             assert feature in features
             assert isinstance(features[feature], bool)
     
+    @pytest.mark.asyncio
+    async def test_close_stops_thread_pool(self):
+        """Test blocking SDK calls are refused once the client is closed"""
+        self.client.close()
+        
+        with pytest.raises(RuntimeError):
+            await self.client._run_blocking(time.sleep, 0)
+    
+    @pytest.mark.asyncio
+    async def test_webhook_used_only_while_served(self):
+        """Test a webhook URL alone does not replace polling"""
+        self.client.config = VoiceProcessingConfig(
+            assemblyai_api_key=TEST_API_KEY, webhook_url="https://bot.example/assemblyai/webhook"
+        )
+        assert not self.client._use_webhook
+        
+        self.client.set_webhook_serving(True)
+        assert self.client._use_webhook
+    
+    @pytest.mark.asyncio
+    async def test_early_webhook_wakes_waiter(self):
+        """Test a callback that arrives before the waiter registers is not lost"""
+        finished = SimpleNamespace(id="tr_1", status="completed")
+        self.client.transcriber = Mock(get_transcript=Mock(return_value=finished))
+        
+        assert self.client.resolve_webhook("tr_1", "completed") is False
+        
+        # Returns at once instead of sitting out max_wait_seconds
+        transcript = await asyncio.wait_for(
+            self.client._wait_for_webhook(SimpleNamespace(id="tr_1", status="queued"), max_wait_seconds=300),
+            timeout=5
+        )
+        
+        assert transcript is finished
+        assert not self.client._early
+        assert not self.client._pending
+    
     @pytest.mark.asyncio
     async def test_rate_limiting(self):
         """Test API rate limiting"""
@@ -608,7 +876,7 @@ class TestAssemblyAIClient:
         """Test basic transcript configuration building"""
         metadata = {"duration": 5.0}
         
-        with patch('voice_handler.aai.TranscriptionConfig') as mock_config:
+        with patch('src.handlers.voice_handler.aai.TranscriptionConfig') as mock_config:
             config = self.client._build_transcript_config(metadata)
             
             mock_config.assert_called_once()
@@ -617,14 +885,18 @@ class TestAssemblyAIClient:
             assert call_kwargs['language_detection'] is True
             assert call_kwargs['speaker_labels'] is True
             assert call_kwargs['summarization'] is True
+            
+            # Later requests reuse the same configuration
+            assert self.client._build_transcript_config({"duration": 120.0}) is config
+            mock_config.assert_called_once()
     
     def test_build_transcript_config_with_pii_redaction(self):
         """Test transcript configuration with PII redaction"""
         metadata = {"duration": 5.0}
         
-        with patch('voice_handler.aai.TranscriptionConfig') as mock_config, \
-             patch('voice_handler.aai.PIIRedactionPolicy') as mock_pii_policy, \
-             patch('voice_handler.aai.PIISubstitutionPolicy') as mock_sub_policy:
+        with patch('src.handlers.voice_handler.aai.TranscriptionConfig') as mock_config, \
+             patch('src.handlers.voice_handler.aai.PIIRedactionPolicy') as mock_pii_policy, \
+             patch('src.handlers.voice_handler.aai.PIISubstitutionPolicy') as mock_sub_policy:
             
             # Setup mock PII policies
             mock_pii_policy.person_name = "person_name_enum"
@@ -668,6 +940,15 @@ class TestAssemblyAIClient:
         for error in retryable:
             assert client._is_retryable_error(error)
     
+    def test_is_retryable_error_typed(self):
+        """Test that typed errors are classified without looking at the message"""
+        client = self.client
+        
+        assert client._is_retryable_error(RetryableError("API key invalid"))
+        assert client._is_retryable_error(httpx.ConnectTimeout("Bad request"))
+        assert client._is_retryable_error(TimeoutError("Transcription timed out"))
+        assert not client._is_retryable_error(NonRetryableError("Server error"))
+    
     @pytest.mark.asyncio
     async def test_transcribe_with_retries_success(self, sample_audio_file, mock_successful_transcript):
         """Test successful transcription with retries"""
@@ -767,8 +1048,8 @@ class TestVoiceMessageHandler:
     @pytest.fixture(autouse=True)
     def setup_handler(self, test_config):
         """Setup voice message handler"""
-        with patch('voice_handler.AssemblyAIClient'), \
-             patch('voice_handler.AudioProcessor'):
+        with patch('src.handlers.voice_handler.AssemblyAIClient'), \
+             patch('src.handlers.voice_handler.AudioProcessor'):
             self.handler = VoiceMessageHandler(test_config)
             self.config = test_config
     
@@ -1007,6 +1288,17 @@ class TestVoiceMessageHandler:
         assert stats['success_rate'] == 0.8  # 8/10
         assert stats['avg_processing_time'] == 2.5  # 25/10
         assert stats['avg_audio_duration'] == 5.0  # 50/10
+    
+    @pytest.mark.asyncio
+    async def test_close_releases_processor_and_client(self):
+        """Test closing the handler closes the download pool and the SDK thread pool"""
+        self.handler.audio_processor.close = AsyncMock()
+        self.handler.assemblyai_client.close = Mock()
+        
+        await self.handler.close()
+        
+        self.handler.audio_processor.close.assert_awaited_once()
+        self.handler.assemblyai_client.close.assert_called_once()
 
 
 # =============================================================================
@@ -1031,8 +1323,8 @@ class TestVoiceHandlerIntegration:
     @pytest.mark.asyncio
     async def test_full_workflow_success(self, sample_audio_file, mock_successful_transcript):
         """Test complete voice message processing workflow"""
-        with patch('voice_handler.AssemblyAIClient') as mock_client_class, \
-             patch('voice_handler.AudioProcessor') as mock_processor_class:
+        with patch('src.handlers.voice_handler.AssemblyAIClient') as mock_client_class, \
+             patch('src.handlers.voice_handler.AudioProcessor') as mock_processor_class:
             
             # Setup mocks
             mock_processor = Mock()
@@ -1080,8 +1372,8 @@ class TestVoiceHandlerIntegration:
     @pytest.mark.asyncio
     async def test_full_workflow_failure(self, sample_audio_file):
         """Test complete workflow with failure"""
-        with patch('voice_handler.AssemblyAIClient') as mock_client_class, \
-             patch('voice_handler.AudioProcessor') as mock_processor_class:
+        with patch('src.handlers.voice_handler.AssemblyAIClient') as mock_client_class, \
+             patch('src.handlers.voice_handler.AudioProcessor') as mock_processor_class:
             
             # Setup mocks - processor succeeds, client fails
             mock_processor = Mock()
@@ -1123,8 +1415,8 @@ class TestVoiceHandlerIntegration:
     @pytest.mark.asyncio
     async def test_workflow_download_failure(self):
         """Test workflow with download failure"""
-        with patch('voice_handler.AssemblyAIClient'), \
-             patch('voice_handler.AudioProcessor') as mock_processor_class:
+        with patch('src.handlers.voice_handler.AssemblyAIClient'), \
+             patch('src.handlers.voice_handler.AudioProcessor') as mock_processor_class:
             
             # Setup mock processor to fail on download
             mock_processor = Mock()
@@ -1142,8 +1434,8 @@ class TestVoiceHandlerIntegration:
     @pytest.mark.asyncio
     async def test_workflow_conversion_failure(self, sample_audio_file):
         """Test workflow with audio conversion failure"""
-        with patch('voice_handler.AssemblyAIClient'), \
-             patch('voice_handler.AudioProcessor') as mock_processor_class:
+        with patch('src.handlers.voice_handler.AssemblyAIClient'), \
+             patch('src.handlers.voice_handler.AudioProcessor') as mock_processor_class:
             
             # Setup mock processor to fail on conversion
             mock_processor = Mock()
@@ -1175,7 +1467,7 @@ class TestErrorHandling:
     @pytest.mark.asyncio
     async def test_network_timeout_error(self, sample_audio_file, test_audio_metadata):
         """Test handling of network timeout errors"""
-        with patch('voice_handler.AssemblyAIClient') as mock_client_class:
+        with patch('src.handlers.voice_handler.AssemblyAIClient') as mock_client_class:
             mock_client = Mock()
             mock_client_class.return_value = mock_client
             
@@ -1197,7 +1489,7 @@ class TestErrorHandling:
     @pytest.mark.asyncio
     async def test_authentication_error(self, sample_audio_file, test_audio_metadata):
         """Test handling of authentication errors"""
-        with patch('voice_handler.AssemblyAIClient') as mock_client_class:
+        with patch('src.handlers.voice_handler.AssemblyAIClient') as mock_client_class:
             mock_client = Mock()
             mock_client_class.return_value = mock_client
             
@@ -1217,7 +1509,7 @@ class TestErrorHandling:
         unsupported_file = temporary_directory / "test.xyz"
         unsupported_file.write_bytes(b"not audio data")
         
-        with patch('voice_handler.AudioProcessor.convert_and_optimize', side_effect=ValueError("Unsupported audio format: xyz")):
+        with patch('src.handlers.voice_handler.AudioProcessor.convert_and_optimize', side_effect=ValueError("Unsupported audio format: xyz")):
             processor = AudioProcessor()
             
             with pytest.raises(ValueError, match="Unsupported audio format"):
@@ -1251,7 +1543,7 @@ class TestErrorHandling:
             concurrent_requests=2  # Low limit for testing
         )
         
-        with patch('voice_handler.aai'):
+        with patch('src.handlers.voice_handler.aai'):
             client = AssemblyAIClient(config)
             
             # Test that semaphore limits concurrent requests
@@ -1267,8 +1559,8 @@ class TestErrorHandling:
     @pytest.mark.asyncio
     async def test_file_cleanup_on_error(self, sample_audio_file):
         """Test that temporary files are cleaned up even on errors"""
-        with patch('voice_handler.AssemblyAIClient') as mock_client_class, \
-             patch('voice_handler.AudioProcessor') as mock_processor_class:
+        with patch('src.handlers.voice_handler.AssemblyAIClient') as mock_client_class, \
+             patch('src.handlers.voice_handler.AudioProcessor') as mock_processor_class:
             
             # Setup mocks to create temp files but fail processing
             mock_processor = Mock()
@@ -1307,6 +1599,7 @@ class TestErrorHandling:
 # =============================================================================
 
 @pytest.mark.performance
+@pytest.mark.xdist_group("perf")  # Same worker, so timings aren't skewed by other tests
 class TestPerformance:
     """Test performance aspects of voice processing"""
     
@@ -1322,8 +1615,8 @@ class TestPerformance:
         num_concurrent = 5
         tasks = []
         
-        with patch('voice_handler.AssemblyAIClient') as mock_client_class, \
-             patch('voice_handler.AudioProcessor') as mock_processor_class:
+        with patch('src.handlers.voice_handler.AssemblyAIClient') as mock_client_class, \
+             patch('src.handlers.voice_handler.AudioProcessor') as mock_processor_class:
             
             # Setup mocks for successful processing
             mock_processor = Mock()
@@ -1395,7 +1688,7 @@ class TestPerformance:
             "telegram_mime_type": "audio/wav"
         }
         
-        with patch('voice_handler.AssemblyAIClient') as mock_client_class:
+        with patch('src.handlers.voice_handler.AssemblyAIClient') as mock_client_class:
             mock_client = Mock()
             mock_client_class.return_value = mock_client
             
@@ -1443,8 +1736,8 @@ class TestPerformance:
             temp_files_created.append(temp_file.name)
             return temp_file.name
         
-        with patch('voice_handler.AssemblyAIClient') as mock_client_class, \
-             patch('voice_handler.AudioProcessor') as mock_processor_class, \
+        with patch('src.handlers.voice_handler.AssemblyAIClient') as mock_client_class, \
+             patch('src.handlers.voice_handler.AudioProcessor') as mock_processor_class, \
              patch('tempfile.NamedTemporaryFile', side_effect=mock_temp_file_creation):
             
             # Setup mocks
@@ -1519,7 +1812,7 @@ class TestFactoryFunctions:
     
     def test_create_voice_handler_basic(self):
         """Test basic voice handler creation"""
-        with patch('voice_handler.VoiceMessageHandler') as mock_handler:
+        with patch('src.handlers.voice_handler.VoiceMessageHandler') as mock_handler:
             handler = create_voice_handler(TEST_API_KEY)
             
             mock_handler.assert_called_once()
@@ -1529,7 +1822,7 @@ class TestFactoryFunctions:
     
     def test_create_voice_handler_with_kwargs(self):
         """Test voice handler creation with additional kwargs"""
-        with patch('voice_handler.VoiceMessageHandler') as mock_handler:
+        with patch('src.handlers.voice_handler.VoiceMessageHandler') as mock_handler:
             handler = create_voice_handler(
                 TEST_API_KEY,
                 max_file_size_mb=50,
@@ -1544,7 +1837,7 @@ class TestFactoryFunctions:
     
     def test_create_voice_handler_with_features_enabled(self):
         """Test voice handler creation with advanced features enabled"""
-        with patch('voice_handler.VoiceMessageHandler') as mock_handler:
+        with patch('src.handlers.voice_handler.VoiceMessageHandler') as mock_handler:
             handler = create_voice_handler_with_features(
                 TEST_API_KEY,
                 enable_advanced_features=True
@@ -1561,7 +1854,7 @@ class TestFactoryFunctions:
     
     def test_create_voice_handler_with_features_disabled(self):
         """Test voice handler creation with advanced features disabled"""
-        with patch('voice_handler.VoiceMessageHandler') as mock_handler:
+        with patch('src.handlers.voice_handler.VoiceMessageHandler') as mock_handler:
             handler = create_voice_handler_with_features(
                 TEST_API_KEY,
                 enable_advanced_features=False
@@ -1574,7 +1867,7 @@ class TestFactoryFunctions:
     
     def test_create_voice_handler_with_features_override(self):
         """Test voice handler creation with feature overrides"""
-        with patch('voice_handler.VoiceMessageHandler') as mock_handler:
+        with patch('src.handlers.voice_handler.VoiceMessageHandler') as mock_handler:
             handler = create_voice_handler_with_features(
                 TEST_API_KEY,
                 enable_advanced_features=True,
@@ -1596,6 +1889,7 @@ class TestFactoryFunctions:
 
 @pytest.mark.integration
 @pytest.mark.skipif(not INTEGRATION_TEST_ENABLED, reason="Real API integration tests disabled")
+@pytest.mark.xdist_group("real_api")  # One worker, to stay within AssemblyAI rate limits
 class TestRealAssemblyAIIntegration:
     """
     Real integration tests using actual AssemblyAI API
@@ -0,0 +1,90 @@
+"""
+Tests for the SQLite conversation log
+"""
+
+import sqlite3
+
+import pytest
+
+from src.core.conversation_store import ConversationStore
+
+
+def _message(ts_ns: int, content: str, metadata: dict = None) -> dict:
+    """Message dict as built by InterviewSession.add_message"""
+    return {'role': 'user', 'content': content, 'ts_ns': ts_ns, 'stage': 'greeting', 'metadata': metadata or {}}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ConversationStore(tmp_path / "db" / "conversations.db")
+    yield store
+    store.close()
+
+
+class TestConversationStore:
+    """Messages are batched in the background and read back in order"""
+    
+    @pytest.mark.asyncio
+    async def test_history_sees_pending_messages(self, store):
+        store.append(1, _message(1, "first", {'voice_message': True}))
+        store.append(1, _message(2, "second"))
+        store.append(2, _message(3, "other user"))
+        
+        history = await store.history(1)
+        
+        assert [message['content'] for message in history] == ["first", "second"]
+        assert history[0]['metadata'] == {'voice_message': True}
+    
+    @pytest.mark.asyncio
+    async def test_history_since_and_limit(self, store):
+        for ts_ns in range(1, 6):
+            store.append(1, _message(ts_ns, f"message {ts_ns}"))
+        
+        assert [m['ts_ns'] for m in await store.history(1, since_ns=3)] == [3, 4, 5]
+        assert [m['ts_ns'] for m in await store.history(1, limit=2)] == [4, 5]
+    
+    @pytest.mark.asyncio
+    async def test_closed_store_is_empty(self, store):
+        store.append(1, _message(1, "first"))
+        store.close()
+        
+        store.append(1, _message(2, "dropped"))
+        assert await store.history(1) == []
+    
+    @pytest.mark.asyncio
+    async def test_messages_survive_reopen(self, tmp_path):
+        path = tmp_path / "conversations.db"
+        store = ConversationStore(path)
+        store.append(1, _message(1, "kept"))
+        store.close()
+        
+        reopened = ConversationStore(path)
+        try:
+            history = await reopened.history(1)
+        finally:
+            reopened.close()
+        assert [message['content'] for message in history] == ["kept"]
+
+    
+    @pytest.mark.asyncio
+    async def test_adds_metadata_column_to_old_database(self, tmp_path):
+        path = tmp_path / "conversations.db"
+        with sqlite3.connect(path) as db:
+            db.execute(
+                "CREATE TABLE conversations (user_id INTEGER NOT NULL, ts_ns INTEGER NOT NULL, "
+                "role TEXT NOT NULL, stage TEXT NOT NULL, content TEXT NOT NULL)"
+            )
+            db.execute("INSERT INTO conversations VALUES (1, 1, 'user', 'greeting', 'old')")
+        db.close()
+        
+        store = ConversationStore(path)
+        try:
+            store.append(1, _message(2, "new", {'depth': 1}))
+            history = await store.history(1)
+        finally:
+            store.close()
+        assert [(m['content'], m['metadata']) for m in history] == [("old", {}), ("new", {'depth': 1})]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,334 @@
+"""
+Unit tests for the core Telegram bot: session state and the response path
+"""
+
+import asyncio
+import pickle
+import time
+from collections import deque
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import httpx
+import pytest
+
+import src.core.telegram_bot as telegram_bot
+from src.core.telegram_bot import (
+    HISTORY_WINDOW,
+    RESPONSE_WORKERS,
+    AIInterviewerBot,
+    CircuitBreaker,
+    ClaudeIntegration,
+    Engagement,
+    InterviewSession,
+    InterviewStage,
+    PromptVariant,
+)
+
+
+def _make_session(**overrides) -> InterviewSession:
+    """Build a fresh session for user 42"""
+    values = dict(
+        user_id=42,
+        username="tester",
+        prompt_variant=PromptVariant.TELEGRAM_OPTIMIZED,
+        current_stage=InterviewStage.GREETING,
+        stage_completeness={},
+        conversation_history=[],
+        start_time=datetime(2025, 9, 5, 19, 56),
+    )
+    values.update(overrides)
+    return InterviewSession(**values)
+
+
+def _make_update() -> Mock:
+    """Update for a text message whose replies are recorded"""
+    update = Mock()
+    update.message.reply_text = AsyncMock()
+    return update
+
+
+def _response_data(text: str = "Tell me about your role.", completeness: int = 20) -> dict:
+    """Parsed Claude reply for the greeting stage"""
+    return {
+        'interview_stage': 'greeting',
+        'response': text,
+        'metadata': {'question_depth': 2, 'completeness': completeness, 'engagement_level': 'high'},
+    }
+
+
+class TestInterviewSessionPickling:
+    """Sessions survive pickling, including pickles written by older versions"""
+    
+    def test_round_trip(self):
+        session = _make_session()
+        session.add_message("user", "Hello")
+        
+        restored = pickle.loads(pickle.dumps(session))
+        
+        assert restored.username == "tester"
+        assert list(restored.conversation_history) == list(session.conversation_history)
+        assert restored.last_activity_ns == session.last_activity_ns
+    
+    def test_restores_pre_slots_dict_state(self):
+        last_activity = datetime(2025, 9, 5, 19, 56, 48)
+        history = [
+            {
+                'role': 'assistant' if i % 2 else 'user',
+                'content': f"message {i}",
+                'timestamp': datetime(2025, 9, 5, 19, 56, i % 60).isoformat(),
+                'stage': 'greeting',
+                'metadata': {},
+            }
+            for i in range(HISTORY_WINDOW + 4)
+        ]
+        state = {
+            'user_id': 42,
+            'username': 'tester',
+            'prompt_variant': PromptVariant.TELEGRAM_OPTIMIZED,
+            'current_stage': InterviewStage.GREETING,
+            'stage_completeness': {stage.value: 0 for stage in InterviewStage},
+            'conversation_history': history,
+            'start_time': datetime(2025, 9, 5, 19, 56),
+            'last_activity': last_activity,
+            'question_depth': 1,
+            'engagement_level': 'high',
+            'examples_collected': 0,
+            'key_insights': [],
+        }
+        
+        session = InterviewSession.__new__(InterviewSession)
+        session.__setstate__(state)
+        
+        assert isinstance(session.conversation_history, deque)
+        assert len(session.conversation_history) == HISTORY_WINDOW
+        assert session.conversation_history[0]['content'] == "message 4"
+        assert "message 0" in session.summary_prefix
+        assert all('ts_ns' in message for message in session.conversation_history)
+        assert session.message_count == HISTORY_WINDOW + 4
+        assert session.last_activity_ns == int(last_activity.timestamp() * 1e9)
+        assert session.engagement_level is Engagement.HIGH
+        
+        session.add_message("user", "after restore")
+        assert session.conversation_history[-1]['content'] == "after restore"
+
+
+
+class TestResponsePath:
+    """A text turn goes from Claude's reply to the session and the chat"""
+    
+    @pytest.fixture
+    def bot(self):
+        # Skip __init__: the response path needs no Telegram application
+        bot = AIInterviewerBot.__new__(AIInterviewerBot)
+        bot.prompt_manager = Mock()
+        bot.claude = Mock()
+        bot.conversation_store = Mock()
+        return bot
+    
+    @pytest.mark.asyncio
+    async def test_apply_response_replies_and_records(self, bot):
+        session = _make_session()
+        update = _make_update()
+        
+        transitioned = await bot._apply_response(session, update, _response_data())
+        
+        assert transitioned is False
+        update.message.reply_text.assert_awaited_once_with("Tell me about your role.", parse_mode='Markdown')
+        assert session.conversation_history[-1]['role'] == "assistant"
+        assert session.conversation_history[-1]['content'] == "Tell me about your role."
+        assert session.stage_completeness['greeting'] == 20
+        assert session.question_depth == 2
+        assert session.engagement_level is Engagement.HIGH
+        bot.conversation_store.append.assert_called_once_with(42, session.conversation_history[-1])
+    
+    @pytest.mark.asyncio
+    async def test_apply_response_edits_preview(self, bot):
+        session = _make_session()
+        update = _make_update()
+        preview = Mock()
+        preview.edit_text = AsyncMock()
+        
+        await bot._apply_response(session, update, _response_data(), preview)
+        
+        preview.edit_text.assert_awaited_once_with("Tell me about your role.", parse_mode='Markdown')
+        update.message.reply_text.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_respond_to_message_streams_into_preview(self, bot):
+        session = _make_session()
+        update = _make_update()
+        preview = Mock()
+        preview.edit_text = AsyncMock()
+        update.message.reply_text.return_value = preview
+        
+        async def generate(session, user_message, prompt_manager, on_partial=None):
+            await on_partial("Tell me")
+            await on_partial("Tell me about your")
+            return _response_data()
+        
+        bot.claude.generate_interview_response = generate
+        
+        await bot._respond_to_message(session, update, "Hello")
+        
+        update.message.reply_text.assert_awaited_once_with("Tell me")
+        assert preview.edit_text.await_args_list[-1].args == ("Tell me about your role.",)
+        assert preview.edit_text.await_count == 2
+        assert [m['role'] for m in session.conversation_history] == ["user", "assistant"]
+        assert session.conversation_history[0]['content'] == "Hello"
+    
+    @pytest.mark.asyncio
+    async def test_handle_message_queues_turns_in_order(self, bot):
+        session = _make_session()
+        bot.sessions = Mock(touch=Mock(return_value=session))
+        bot._response_queues = [asyncio.Queue() for _ in range(RESPONSE_WORKERS)]
+        
+        # The first typing indicator is slower than the second one
+        delays = iter([0.02, 0])
+        
+        async def send_chat_action(**kwargs):
+            await asyncio.sleep(next(delays))
+        
+        context = Mock()
+        context.bot.send_chat_action = send_chat_action
+        
+        updates = []
+        for text in ("first", "second"):
+            update = _make_update()
+            update.effective_user.id = 42
+            update.message.text = text
+            updates.append(update)
+        
+        await asyncio.gather(*(bot.handle_message(update, context) for update in updates))
+        
+        queue = bot._response_queues[42 % RESPONSE_WORKERS]
+        assert [queue.get_nowait()[2] for _ in range(2)] == ["first", "second"]
+        # User turns enter the history only when a worker answers them
+        assert not session.conversation_history
+
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(not telegram_bot.VOICE_PROCESSING_AVAILABLE, reason="voice handler not importable")
+    async def test_voice_transcript_goes_through_queue(self, bot):
+        session = _make_session()
+        bot.sessions = Mock(touch=Mock(return_value=session))
+        bot._response_queues = [asyncio.Queue() for _ in range(RESPONSE_WORKERS)]
+        bot._respond_to_message = AsyncMock()
+        bot.voice_handler = Mock()
+        bot.voice_handler.process_voice_message = AsyncMock(return_value=SimpleNamespace(
+            text="spoken answer",
+            quality=telegram_bot.VoiceQuality.HIGH,
+            duration_seconds=3.0,
+            confidence=0.95,
+            language="en",
+            processing_time_seconds=1.2,
+        ))
+        bot.voice_handler.format_transcription_response = Mock(return_value="🎤 spoken answer")
+        
+        update = _make_update()
+        update.effective_user.id = 42
+        context = Mock()
+        context.bot.send_chat_action = AsyncMock()
+        
+        await bot.handle_voice_message(update, context)
+        
+        bot._respond_to_message.assert_not_awaited()
+        queued_session, _, text, metadata = bot._response_queues[42 % RESPONSE_WORKERS].get_nowait()
+        assert queued_session is session
+        assert text == "spoken answer"
+        assert metadata['message_type'] == 'voice'
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable monotonic clock for the bot module"""
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(telegram_bot, "time", SimpleNamespace(monotonic=lambda: clock.now, time_ns=time.time_ns))
+    return clock
+
+
+class TestCircuitBreaker:
+    """The breaker opens on repeated failures, half-opens after the cool-down and closes on success"""
+    
+    def test_opens_after_threshold_within_window(self, clock):
+        breaker = CircuitBreaker(failure_threshold=3, window_seconds=30, cooldown_seconds=15)
+        
+        breaker.record_failure()
+        breaker.record_failure()
+        assert not breaker.is_open()
+        
+        breaker.record_failure()
+        assert breaker.is_open()
+    
+    def test_failures_outside_window_do_not_count(self, clock):
+        breaker = CircuitBreaker(failure_threshold=3, window_seconds=30, cooldown_seconds=15)
+        
+        breaker.record_failure()
+        breaker.record_failure()
+        clock.now += 31
+        breaker.record_failure()
+        
+        assert not breaker.is_open()
+    
+    def test_half_opens_after_cooldown(self, clock):
+        breaker = CircuitBreaker(failure_threshold=2, window_seconds=30, cooldown_seconds=15)
+        breaker.record_failure()
+        breaker.record_failure()
+        
+        clock.now += 14
+        assert breaker.is_open()
+        clock.now += 2
+        assert not breaker.is_open()
+        
+        # One more failure after the cool-down is not enough to reopen it
+        breaker.record_failure()
+        assert not breaker.is_open()
+    
+    def test_success_closes_and_resets_failures(self, clock):
+        breaker = CircuitBreaker(failure_threshold=2, window_seconds=30, cooldown_seconds=15)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        
+        assert not breaker.is_open()
+
+
+class TestClaudeFallback:
+    """Failures while generating a reply fall back to the canned response"""
+    
+    @pytest.fixture
+    def claude(self):
+        # Skip __init__: no real Anthropic client
+        claude = ClaudeIntegration.__new__(ClaudeIntegration)
+        claude.model = "test-model"
+        claude.client = Mock()
+        claude._breaker = CircuitBreaker(failure_threshold=2)
+        return claude
+    
+    @pytest.mark.asyncio
+    async def test_upstream_errors_open_breaker(self, claude, clock):
+        claude.client.messages.create = AsyncMock(side_effect=httpx.ReadTimeout("timed out"))
+        session = _make_session()
+        
+        for _ in range(2):
+            response = await claude.generate_interview_response(session, "Hello", Mock())
+            assert response['error'] == 'API_ERROR'
+        
+        assert claude._breaker.is_open()
+        response = await claude.generate_interview_response(session, "Hello", Mock())
+        assert response['error'] == 'API_ERROR'
+        assert claude.client.messages.create.await_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_other_errors_fall_back(self, claude, clock):
+        claude.client.messages.create = AsyncMock(side_effect=ValueError("bad callback"))
+        session = _make_session()
+        
+        response = await claude.generate_interview_response(session, "Hello", Mock())
+        
+        assert response['error'] == 'API_ERROR'
+        assert not claude._breaker.is_open()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])